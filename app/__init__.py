@@ -5,6 +5,9 @@ from flask_jwt_extended import JWTManager
 from flask_httpauth import HTTPBasicAuth
 from flasgger import Swagger
 from app.config import config
+from app.utils.credential_cache import credential_cache
+from app.utils.identity_cache import identity_cache
+from app.utils.password_hasher import password_hasher
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -17,12 +20,19 @@ def create_app(config_name='default'):
                 static_folder='static',
                 static_url_path='/static')
     
+    # orjson when installed; encoding time shows up in the Server-Timing header
+    from app.utils.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
     # Load configuration
     app.config.from_object(config[config_name])
     
     # Initialize extensions
     db.init_app(app)
     jwt.init_app(app)
+    credential_cache.init_app(app)
+    identity_cache.init_app(app)
+    password_hasher.init_app(app)
     CORS(app)
     
     # Initialize Swagger
@@ -114,6 +124,10 @@ Click the **"Authorize"** button (top right) and choose one method:
     from app.middleware.logging import setup_request_logging
     setup_request_logging(app)
     
+    # Setup request log retention (background purge)
+    from app.utils.log_retention import init_log_retention
+    init_log_retention(app)
+    
     # Setup error playground middleware
     from app.middleware.error_playground import setup_error_playground
     setup_error_playground(app)
@@ -128,9 +142,25 @@ Click the **"Authorize"** button (top right) and choose one method:
             os.makedirs(instance_path)
             print(f"✅ Created instance directory: {instance_path}")
         
-        # Create tables if they don't exist
+        # Logs bind gets its own SQLite pragmas (WAL etc.)
+        from app.utils.schema import set_sqlite_pragmas, upgrade_schema
+        set_sqlite_pragmas(db.engines['logs'], app.config['REQUEST_LOG_SQLITE_PRAGMAS'])
+        
+        # SQL time shows up in the Server-Timing header
+        from app.middleware.timing import instrument_engine
+        for engine in db.engines.values():
+            instrument_engine(engine)
+        
+        # Create tables if they don't exist (on every bind)
         db.create_all()
         
+        # Add columns/indexes introduced since the database was created
+        upgrade_schema()
+        
+        # Full-text index over todos (FTS5 on SQLite)
+        from app.utils.todo_search import init_todo_search
+        init_todo_search(app, db.engine)
+        
         # Auto-seed if database is empty
         from app.models import User
         if User.query.count() == 0:
@@ -1,6 +1,18 @@
 import os
 from datetime import timedelta
 
+def default_log_database_url(database_url):
+    """
+    Request logs get their own SQLite file next to the main one
+    (apilab.db -> apilab_logs.db) so log writes never wait on the todo
+    writer lock. Other engines keep logs in the main database by default.
+    """
+    if not database_url.startswith('sqlite'):
+        return database_url
+    if database_url.endswith('.db'):
+        return database_url[:-len('.db')] + '_logs.db'
+    return database_url
+
 class Config:
     """Base configuration"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -13,6 +25,109 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///apilab.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Request logs live on their own bind (REQUEST_LOG_DATABASE_URL)
+    SQLALCHEMY_BINDS = {
+        'logs': os.environ.get('REQUEST_LOG_DATABASE_URL') or default_log_database_url(SQLALCHEMY_DATABASE_URI)
+    }
+    # Applied to the logs bind when it is SQLite: WAL lets readers (admin
+    # queries, the live tail) run alongside the writer, and logs can afford
+    # synchronous=NORMAL
+    REQUEST_LOG_SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000
+    }
+    
+    # Request logging
+    # Logs are queued and bulk-inserted by a background thread so requests
+    # never wait on a commit. Set REQUEST_LOG_ASYNC=false to write inline.
+    REQUEST_LOG_ASYNC = os.environ.get('REQUEST_LOG_ASYNC', 'true').lower() == 'true'
+    REQUEST_LOG_QUEUE_SIZE = int(os.environ.get('REQUEST_LOG_QUEUE_SIZE', 10000))
+    REQUEST_LOG_BATCH_SIZE = int(os.environ.get('REQUEST_LOG_BATCH_SIZE', 100))
+    REQUEST_LOG_FLUSH_INTERVAL_MS = int(os.environ.get('REQUEST_LOG_FLUSH_INTERVAL_MS', 500))
+    
+    # Request log sampling
+    # Errors (4xx/5xx) and slow requests are always kept. Other requests go
+    # through the first matching rule (method / path prefix / status), else
+    # REQUEST_LOG_SAMPLE_RATE. When more than REQUEST_LOG_WRITE_BUDGET rows/sec
+    # are being kept (0 = no budget), sampled traffic backs off automatically.
+    REQUEST_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_LOG_SAMPLE_RATE', 1.0))
+    REQUEST_LOG_SLOW_MS = int(os.environ.get('REQUEST_LOG_SLOW_MS', 1000))
+    REQUEST_LOG_WRITE_BUDGET = int(os.environ.get('REQUEST_LOG_WRITE_BUDGET', 0))
+    REQUEST_LOG_SAMPLE_RULES = [
+        {'method': 'OPTIONS', 'rate': 0.0},        # CORS preflights
+        {'path': '/apispec.json', 'rate': 0.0},
+        {'path': '/flasgger_static', 'rate': 0.0},
+        {'path': '/api/docs', 'rate': 0.0},
+        {'path': '/api/scenarios', 'rate': 0.0},
+        {'path': '/api/postman/collection', 'rate': 0.0},
+        {'path': '/api/admin/logs/stream', 'rate': 0.0},
+    ]
+    
+    # Request log retention
+    # A background job deletes logs older than REQUEST_LOG_MAX_AGE_HOURS and
+    # beyond the newest REQUEST_LOG_MAX_ROWS (0 disables either limit), in
+    # batches of REQUEST_LOG_PURGE_BATCH_SIZE rows.
+    REQUEST_LOG_MAX_AGE_HOURS = int(os.environ.get('REQUEST_LOG_MAX_AGE_HOURS', 168))
+    REQUEST_LOG_MAX_ROWS = int(os.environ.get('REQUEST_LOG_MAX_ROWS', 100000))
+    REQUEST_LOG_PURGE_BATCH_SIZE = int(os.environ.get('REQUEST_LOG_PURGE_BATCH_SIZE', 500))
+    REQUEST_LOG_PURGE_INTERVAL_SECONDS = int(os.environ.get('REQUEST_LOG_PURGE_INTERVAL_SECONDS', 60))
+    
+    # Live log tail (Server-Sent Events)
+    # Each open stream holds a worker thread; streams end after
+    # LOG_STREAM_MAX_SECONDS and the browser reconnects where it left off.
+    # At most LOG_STREAM_MAX_CLIENTS streams are held open per process (keep
+    # it well below gunicorn's --threads); further viewers get one batch of
+    # new logs per request and reconnect every LOG_STREAM_FALLBACK_RETRY_SECONDS.
+    LOG_STREAM_POLL_SECONDS = float(os.environ.get('LOG_STREAM_POLL_SECONDS', 1.0))
+    LOG_STREAM_MAX_SECONDS = int(os.environ.get('LOG_STREAM_MAX_SECONDS', 30))
+    LOG_STREAM_MAX_CLIENTS = int(os.environ.get('LOG_STREAM_MAX_CLIENTS', 2))
+    LOG_STREAM_FALLBACK_RETRY_SECONDS = float(os.environ.get('LOG_STREAM_FALLBACK_RETRY_SECONDS', 3.0))
+    
+    # Verified-credential cache
+    # Successful Basic Auth checks are remembered (keyed by an HMAC of the
+    # credentials) so repeat requests skip password hashing. 0 disables.
+    CREDENTIAL_CACHE_SIZE = int(os.environ.get('CREDENTIAL_CACHE_SIZE', 1024))
+    CREDENTIAL_CACHE_TTL_SECONDS = int(os.environ.get('CREDENTIAL_CACHE_TTL_SECONDS', 300))
+    
+    # User identity cache
+    # Compact (id, email, role) snapshots of authenticated users, so requests
+    # don't reload the users row. Changes made by another worker process are
+    # only seen after the TTL. 0 disables.
+    IDENTITY_CACHE_SIZE = int(os.environ.get('IDENTITY_CACHE_SIZE', 1024))
+    IDENTITY_CACHE_TTL_SECONDS = int(os.environ.get('IDENTITY_CACHE_TTL_SECONDS', 60))
+    
+    # Password hashing
+    # Method is 'scrypt' or 'pbkdf2'; cost is the scrypt N (power of two) or the
+    # PBKDF2 iteration count, defaulting to werkzeug's (32768 / 600000). Cheap
+    # costs suit load-test environments; existing hashes are upgraded to the
+    # configured setting on the user's next successful login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_COST = int(os.environ.get('PASSWORD_HASH_COST', 0)) or None
+    
+    # Password hashing pool
+    # Hash/verify passwords on this many worker processes (0 = inline in the
+    # request thread). Beyond workers + queue size in-flight checks, logins
+    # fail fast with 503 instead of queueing.
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 16))
+    
+    # Most creates + updates + deletes accepted by one POST /api/todos/bulk
+    TODO_BULK_MAX_ITEMS = int(os.environ.get('TODO_BULK_MAX_ITEMS', 10000))
+
+    # Streamed responses (GET /api/admin/users and table exports)
+    # Rows fetched from the database cursor and encoded per chunk
+    JSON_STREAM_BATCH_SIZE = int(os.environ.get('JSON_STREAM_BATCH_SIZE', 500))
+    
+    # Per-request phase timing (auth, chaos, db, serialize, log)
+    # Sent as a Server-Timing header; optionally stored on each log row too.
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'true').lower() == 'true'
+    REQUEST_LOG_STORE_TIMINGS = os.environ.get('REQUEST_LOG_STORE_TIMINGS', 'false').lower() == 'true'
+    
+    # Metrics
+    # Optional static bearer token for scraping /api/admin/metrics without a JWT
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
     # CORS
     CORS_HEADERS = 'Content-Type'
     
@@ -1,15 +1,158 @@
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask import jsonify, request
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
 from app.models import User
-from app import basic_auth
+from app import db, jwt, basic_auth
+from app.middleware.timing import timed
+from app.utils.credential_cache import credential_cache
+from app.utils.identity_cache import identity_cache
+
+def check_credentials(email, password):
+    """
+    Return the UserIdentity for a valid email/password, else None.
+    Recently verified credentials skip the password hash (see CredentialCache)
+    and, with a cached identity, the database entirely.
+    """
+    identity = identity_cache.get_by_email(email)
+    if not identity:
+        return None
+    
+    digest = credential_cache.digest(email, password)
+    if credential_cache.lookup(digest, identity):
+        return identity
+    
+    # The hash itself isn't cached; verify against the row
+    user = db.session.get(User, identity.id)
+    if user and user.check_password(password):
+        if db.session.is_modified(user):
+            # Rehashed with the configured cost; the identity snapshot is now stale
+            db.session.commit()
+            identity = identity_cache.get(user.id)
+        credential_cache.store(digest, user)
+        return identity
+    return None
+
+def _auth_state():
+    """
+    The current request's memoized auth state.
+    Kept in the request's environ, not on g: g belongs to the app context,
+    which can outlive a request (an enclosing app_context(), a streamed body
+    still being read) and would hand one request's principal to the next.
+    """
+    return request.environ.setdefault('apilab.auth', {})
+
+def resolve_auth():
+    """
+    Authenticate the current request at most once.
+    
+    Returns (auth_method, user_id) where auth_method is 'token', 'basic' or
+    'none' and user_id is None when authentication failed. The result is
+    memoized per request, so routes, decorators and the logging middleware all
+    share one JWT decode / one password check per request.
+    """
+    state = _auth_state()
+    if 'principal' in state:
+        return state['principal']
+    
+    auth_method, user_id, user = 'none', None, None
+    auth_header = request.headers.get('Authorization', '')
+    
+    with timed('auth'):
+        if auth_header.startswith('Bearer '):
+            auth_method = 'token'
+            try:
+                # Reuse the token @jwt_required already verified, if any
+                try:
+                    identity = get_jwt_identity()
+                except RuntimeError:
+                    verify_jwt_in_request(optional=True)
+                    identity = get_jwt_identity()
+                user_id = int(identity) if identity else None
+            except Exception:
+                user_id = None
+        
+        elif auth_header.startswith('Basic '):
+            auth_method = 'basic'
+            credentials = request.authorization
+            if credentials and credentials.username and credentials.password is not None:
+                user = check_credentials(credentials.username, credentials.password)
+                user_id = user.id if user else None
+    
+    state['principal'] = (auth_method, user_id)
+    state['user'] = user
+    return state['principal']
+
+def get_current_user():
+    """
+    The authenticated user's UserIdentity (id, email, role) for this request, or None.
+    Authenticates via resolve_auth(); the snapshot comes from the identity cache.
+    Use load_current_user() when the full User row is needed.
+    """
+    auth_method, user_id = resolve_auth()
+    state = _auth_state()
+    
+    if user_id is not None and not state.get('user_loaded'):
+        if state['user'] is None:
+            with timed('auth'):
+                state['user'] = identity_cache.get(user_id)
+        state['user_loaded'] = True
+    
+    return state['user']
+
+def load_current_user():
+    """The authenticated User row for this request (for reading or changing it), or None"""
+    identity = get_current_user()
+    if identity is None:
+        return None
+    return db.session.get(User, identity.id)
+
+def get_current_role():
+    """
+    The authenticated user's role, or None.
+    Bearer tokens carry it as a verified claim (no lookup); Basic Auth and
+    tokens issued before the claim existed fall back to the user identity.
+    """
+    auth_method, user_id = resolve_auth()
+    if user_id is None:
+        return None
+    
+    if auth_method == 'token':
+        role = get_jwt().get('role')
+        if role is not None:
+            return role
+    
+    user = get_current_user()
+    return user.role if user else None
+
+def peek_auth():
+    """(auth_method, user_id) if this request was already authenticated, else None"""
+    return _auth_state().get('principal')
+
+# JWT revocation: a token is only valid for the user's current token_generation
+@jwt.token_in_blocklist_loader
+def is_token_revoked(jwt_header, jwt_payload):
+    """Checked against the in-process identity cache, not the database"""
+    try:
+        identity = identity_cache.get(int(jwt_payload['sub']))
+    except (KeyError, TypeError, ValueError):
+        return True
+    return identity is None or jwt_payload.get('gen', 0) != identity.token_generation
+
+@jwt.revoked_token_loader
+def revoked_token_response(jwt_header, jwt_payload):
+    """Return JSON error for revoked (or orphaned) tokens"""
+    return jsonify({
+        'error': 'Token has been revoked',
+        'code': 'TOKEN_REVOKED',
+        'hint': 'Your role or access changed - log in again for a new token'
+    }), 401
 
 # Basic Auth password verifier
 @basic_auth.verify_password
 def verify_password(email, password):
-    """Verify Basic Auth credentials"""
-    user = User.query.filter_by(email=email).first()
-    if user and user.check_password(password):
+    """Verify Basic Auth credentials (via the shared per-request resolver)"""
+    user = get_current_user()
+    if user and resolve_auth()[0] == 'basic' and user.email == email:
         return user
     return None
 
@@ -29,16 +172,15 @@ def admin_required():
         @wraps(fn)
         def decorator(*args, **kwargs):
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
+            role = get_current_role()
             
-            if not user:
+            if role is None:
                 return jsonify({
                     'error': 'User not found',
                     'code': 'USER_NOT_FOUND'
                 }), 404
             
-            if user.role != 'admin':
+            if role != 'admin':
                 return jsonify({
                     'error': 'Admin access required',
                     'code': 'ADMIN_REQUIRED'
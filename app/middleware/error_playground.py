@@ -6,6 +6,7 @@ Simulates various API errors for educational purposes
 import random
 import time
 from flask import request, jsonify, g
+from app.middleware.timing import timed
 
 # Error scenarios for learning
 ERROR_SCENARIOS = [
@@ -47,7 +48,11 @@ def setup_error_playground(app):
     @app.before_request
     def inject_chaos():
         """Randomly inject errors based on settings"""
-        
+        with timed('chaos'):
+            return _inject_chaos()
+    
+    def _inject_chaos():
+        """Apply simulated latency / errors requested via query params"""
         # Skip for static files and admin endpoints
         if request.path.startswith('/static') or request.path == '/api/health':
             return None
@@ -0,0 +1,153 @@
+"""
+Request Log Writer
+Persists RequestLog rows from a background thread in batches,
+so request threads never wait on a database commit.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from app import db
+from app.models import RequestLog
+
+
+class RequestLogWriter:
+    """Bounded in-process queue drained by a worker thread with bulk inserts"""
+
+    def __init__(self, app, max_queue_size=10000, batch_size=100, flush_interval_ms=500):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.queue = queue.Queue(maxsize=max_queue_size)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        # Counters (read via stats())
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    def submit(self, record):
+        """
+        Queue a log record (dict of RequestLog column values).
+        Never blocks: when the queue is full the record is dropped and counted.
+        """
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def flush(self, timeout=5.0):
+        """Block until every queued record has been written (or timeout)"""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.queue.unfinished_tasks == 0
+
+    def stop(self, timeout=5.0):
+        """Stop the worker after writing whatever is still queued"""
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def stats(self):
+        """Snapshot of writer counters"""
+        with self._lock:
+            return {
+                'queue_depth': self.queue.qsize(),
+                'queue_capacity': self.queue.maxsize,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'batches': self.batches,
+                'worker_alive': bool(self._thread and self._thread.is_alive())
+            }
+
+    def _ensure_started(self):
+        """Start the worker lazily (and again after a fork, e.g. gunicorn workers)"""
+        if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='request-log-writer',
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        """Worker loop: collect up to batch_size records or flush_interval, then insert"""
+        while True:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write(batch)
+
+            if self._stop.is_set() and self.queue.empty():
+                return
+
+    def _write(self, batch):
+        """Bulk insert one batch in its own transaction"""
+        try:
+            with self.app.app_context():
+                try:
+                    RequestLog.insert_many(batch)
+                    db.session.commit()
+                    with self._lock:
+                        self.written += len(batch)
+                        self.batches += 1
+                except Exception:
+                    db.session.rollback()
+                    with self._lock:
+                        self.failed += len(batch)
+        finally:
+            for _ in batch:
+                self.queue.task_done()
+
+
+def init_log_writer(app):
+    """Create the writer for this app and make sure it drains on shutdown"""
+    writer = RequestLogWriter(
+        app,
+        max_queue_size=app.config['REQUEST_LOG_QUEUE_SIZE'],
+        batch_size=app.config['REQUEST_LOG_BATCH_SIZE'],
+        flush_interval_ms=app.config['REQUEST_LOG_FLUSH_INTERVAL_MS']
+    )
+    app.extensions['request_log_writer'] = writer
+    atexit.register(writer.stop)
+    return writer
+
+
+def get_log_writer(app):
+    """Return the app's writer, or None when logs are written synchronously"""
+    return app.extensions.get('request_log_writer')
@@ -1,86 +1,249 @@
 import time
 import json
+import random
+import threading
+from datetime import datetime
 from flask import request, g
 from app import db
 from app.models import RequestLog
+from app.middleware.log_writer import init_log_writer
+from app.middleware.metrics import LatencyHistograms
+from app.middleware.auth import resolve_auth, peek_auth
+from app.middleware.timing import start_request_timing, timed, current_timings, server_timing_header
+from app.utils.paths import route_template
+from app.utils.json_stream import on_stream_end
+
+class LogSampler:
+    """
+    Decides which requests get persisted and with what sample weight.
+    
+    Errors and slow requests are always kept (weight 1). Everything else is
+    kept with the rate of the first matching rule, scaled down by a backoff
+    factor whenever the kept-rows/sec exceeds the write budget. The returned
+    weight (1 / keep probability) lets counts be extrapolated later.
+    """
+    
+    MIN_BACKOFF = 0.001
+    
+    def __init__(self, rules, default_rate=1.0, slow_ms=1000, write_budget=0):
+        self.rules = rules
+        self.default_rate = default_rate
+        self.slow_ms = slow_ms
+        self.write_budget = write_budget
+        
+        self._lock = threading.Lock()
+        self.backoff = 1.0
+        self._window_start = time.monotonic()
+        self._window_forced = 0
+        self._window_sampled = 0
+        
+        # Counters (read via stats())
+        self.kept = 0
+        self.dropped = 0
+    
+    def decide(self, method, path, status_code, latency_ms):
+        """Return the sample weight to store, or None to drop the request"""
+        if status_code >= 400 or (latency_ms is not None and latency_ms >= self.slow_ms):
+            self._count(forced=True)
+            return 1.0
+        
+        rate = min(self._rate_for(method, path, status_code), 1.0)
+        if self.write_budget:
+            rate *= self.backoff
+        
+        if rate <= 0 or random.random() >= rate:
+            with self._lock:
+                self.dropped += 1
+            return None
+        
+        self._count(forced=False)
+        return 1.0 / rate
+    
+    def stats(self):
+        """Snapshot of sampler counters"""
+        with self._lock:
+            return {
+                'kept': self.kept,
+                'dropped': self.dropped,
+                'default_rate': self.default_rate,
+                'write_budget': self.write_budget,
+                'backoff': round(self.backoff, 4)
+            }
+    
+    def _rate_for(self, method, path, status_code):
+        """Keep rate of the first matching rule"""
+        for rule in self.rules:
+            if 'method' in rule and rule['method'] != method:
+                continue
+            if 'path' in rule and not path.startswith(rule['path']):
+                continue
+            if 'status' in rule and rule['status'] != status_code:
+                continue
+            return rule['rate']
+        return self.default_rate
+    
+    def _count(self, forced):
+        """Count a kept row and re-tune the backoff once per second"""
+        with self._lock:
+            self.kept += 1
+            if forced:
+                self._window_forced += 1
+            else:
+                self._window_sampled += 1
+            
+            if not self.write_budget:
+                return
+            
+            elapsed = time.monotonic() - self._window_start
+            if elapsed < 1.0:
+                return
+            
+            # Budget left after forced rows, versus what sampled traffic
+            # would write with no backoff at all
+            available = max(self.write_budget - self._window_forced / elapsed, 0)
+            demand = self._window_sampled / elapsed / self.backoff
+            if demand:
+                self.backoff = max(min(available / demand, 1.0), self.MIN_BACKOFF)
+            else:
+                self.backoff = 1.0
+            
+            self._window_start = time.monotonic()
+            self._window_forced = 0
+            self._window_sampled = 0
 
 def setup_request_logging(app):
     """Setup request logging middleware"""
     
+    # Background writer (None = write inline, e.g. for debugging)
+    writer = init_log_writer(app) if app.config['REQUEST_LOG_ASYNC'] else None
+    
+    sampler = LogSampler(
+        rules=app.config['REQUEST_LOG_SAMPLE_RULES'],
+        default_rate=app.config['REQUEST_LOG_SAMPLE_RATE'],
+        slow_ms=app.config['REQUEST_LOG_SLOW_MS'],
+        write_budget=app.config['REQUEST_LOG_WRITE_BUDGET']
+    )
+    app.extensions['request_log_sampler'] = sampler
+    
+    # In-memory latency histograms (served by /api/admin/metrics)
+    metrics = LatencyHistograms()
+    app.extensions['request_metrics'] = metrics
+    
     @app.before_request
     def before_request():
         """Record request start time"""
         g.start_time = time.time()
+        g.start_perf = time.perf_counter()
+        start_request_timing()
     
     @app.after_request
     def after_request(response):
         """Log request details after response is generated"""
         
-        # Skip logging for static files and health check
-        if request.path.startswith('/static') or request.path == '/api/health':
+        # Skip logging for static files
+        if request.path.startswith('/static'):
             return response
         
+        route = route_template(request.url_rule.rule if request.url_rule else None, request.path)
+        
+        # Streamed bodies are produced after this hook: measure and log the
+        # request once the last chunk is out. Only the phases so far fit in
+        # the header (no total); the log row gets the full breakdown.
+        if on_stream_end(lambda stream: finish_request(response, route, stream)):
+            if app.config['SERVER_TIMING_ENABLED'] and hasattr(g, 'start_perf'):
+                response.headers['Server-Timing'] = server_timing_header()
+            return response
+        
+        finish_request(response, route)
+        
+        # Per-phase breakdown for this request
+        if app.config['SERVER_TIMING_ENABLED'] and hasattr(g, 'start_perf'):
+            total_ms = (time.perf_counter() - g.start_perf) * 1000
+            response.headers['Server-Timing'] = server_timing_header(total_ms)
+        
+        return response
+    
+    def finish_request(response, route, stream=None):
+        """Latency histogram + request log, once the response is complete"""
+        # A streamed body that failed part-way is a server error, whatever the header said
+        status_code = 500 if stream is not None and stream.error else response.status_code
+        
+        # Record latency histogram (every request, before sampling). Unmatched
+        # paths share one series - each probe URL would otherwise add its own
+        if hasattr(g, 'start_perf'):
+            elapsed_ms = (time.perf_counter() - g.start_perf) * 1000
+            metrics_route = route if request.url_rule else '<unmatched>'
+            metrics.observe(request.method, metrics_route, status_code, elapsed_ms)
+        
+        # Skip logging for health check
+        if request.path != '/api/health':
+            with timed('log'):
+                log_request(response, route, status_code, stream)
+    
+    def log_request(response, route, status_code, stream=None):
+        """Build the log record for this request and persist it (unless sampled out)"""
+        
         # Calculate latency
         latency_ms = int((time.time() - g.start_time) * 1000) if hasattr(g, 'start_time') else None
         
-        # Get request body (if JSON)
+        # Decide before doing any more work for this request
+        sample_weight = sampler.decide(request.method, request.path, status_code, latency_ms)
+        if sample_weight is None:
+            return
+        
+        # Get request body (if JSON) - the bytes as sent, not re-encoded
         request_body = None
         if request.is_json:
-            try:
-                request_body = json.dumps(request.get_json())
-            except:
-                pass
+            request_body = request.get_data(cache=True, as_text=True) or None
         
         # Get response body (if JSON and not too large)
         response_body = None
-        if response.is_json and response.content_length and response.content_length < 10000:
+        if response.is_json and stream is not None:
+            response_body = stream.body
+        elif response.is_json and response.content_length and response.content_length < 10000:
             try:
                 response_body = response.get_data(as_text=True)
             except:
                 pass
         
-        # Detect auth method
-        auth_method = 'none'
-        user_id = None
-        
+        # Detect auth method (reusing the route's authentication when it ran)
         auth_header = request.headers.get('Authorization', '')
-        if auth_header.startswith('Basic '):
-            auth_method = 'basic'
-            # Try to get user from Basic Auth
-            try:
-                from app import basic_auth
-                user = basic_auth.current_user()
-                if user:
-                    user_id = user.id
-            except:
-                pass
-        elif auth_header.startswith('Bearer '):
-            auth_method = 'token'
-            # Try to get user from JWT
-            try:
-                from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-                verify_jwt_in_request(optional=True)
-                user_id = get_jwt_identity()
-            except:
-                pass
+        principal = peek_auth()
+        if principal is None and auth_header.startswith('Bearer '):
+            # Cheap: one JWT decode, no database
+            principal = resolve_auth()
+        
+        if principal:
+            auth_method, user_id = principal
+        else:
+            # Don't hash a password just to label the log row
+            auth_method = 'basic' if auth_header.startswith('Basic ') else 'none'
+            user_id = None
         
         # Create log entry
-        log = RequestLog(
-            method=request.method,
-            path=request.path,
-            status_code=response.status_code,
-            latency_ms=latency_ms,
-            request_body=request_body,
-            response_body=response_body,
-            auth_method=auth_method,
-            user_id=user_id,
-            ip_address=request.remote_addr
-        )
-        
-        db.session.add(log)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status_code': status_code,
+            'latency_ms': latency_ms,
+            'request_body': request_body,
+            'response_body': response_body,
+            'auth_method': auth_method,
+            'user_id': user_id,
+            'ip_address': request.remote_addr,
+            'sample_weight': sample_weight,
+            'timings': json.dumps(current_timings()) if app.config['REQUEST_LOG_STORE_TIMINGS'] else None,
+            'timestamp': datetime.utcnow()
+        }
+        
+        # Hand off to the background writer - no commit on the request path
+        if writer:
+            writer.submit(record)
+            return
+        
         try:
+            RequestLog.insert_many([record])
             db.session.commit()
         except:
             db.session.rollback()
-        
-        return response
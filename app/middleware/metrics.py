@@ -0,0 +1,129 @@
+"""
+Request Metrics
+In-memory latency histograms per (method, route, status), fed by the
+request logging hooks. Reading them never touches the database.
+
+Histograms are per process: with several gunicorn workers, each worker
+reports its own share of the traffic.
+"""
+
+import bisect
+import threading
+
+# Fixed log-scale bucket upper bounds in milliseconds (0.25ms .. ~33s, then +Inf)
+BUCKET_BOUNDS_MS = [0.25 * 2 ** i for i in range(18)]
+
+
+class LatencyHistograms:
+    """Thread-safe fixed-bucket latency histograms keyed by (method, route, status)"""
+
+    def __init__(self, bounds=BUCKET_BOUNDS_MS):
+        self.bounds = list(bounds)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, method, route, status, latency_ms):
+        """Record one request"""
+        index = bisect.bisect_left(self.bounds, latency_ms)
+        key = (method, route, status)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'counts': [0] * (len(self.bounds) + 1),
+                    'sum': 0.0,
+                    'count': 0
+                }
+            series['counts'][index] += 1
+            series['sum'] += latency_ms
+            series['count'] += 1
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    def snapshot(self):
+        """Copy of every series, safe to read without holding the lock"""
+        with self._lock:
+            return {
+                key: {'counts': list(s['counts']), 'sum': s['sum'], 'count': s['count']}
+                for key, s in self._series.items()
+            }
+
+    def percentile(self, counts, total, q):
+        """Estimate the q-th percentile (0-1) by interpolating inside its bucket"""
+        if not total:
+            return None
+
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                # The +Inf bucket has no upper bound; report its lower edge
+                if index >= len(self.bounds):
+                    return lower
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def to_json(self):
+        """Per-series count, mean and p50/p95/p99 in milliseconds"""
+        routes = []
+        for (method, route, status), s in sorted(self.snapshot().items()):
+            routes.append({
+                'method': method,
+                'route': route,
+                'status': status,
+                'count': s['count'],
+                'mean_ms': round(s['sum'] / s['count'], 3) if s['count'] else None,
+                'p50_ms': _round(self.percentile(s['counts'], s['count'], 0.50)),
+                'p95_ms': _round(self.percentile(s['counts'], s['count'], 0.95)),
+                'p99_ms': _round(self.percentile(s['counts'], s['count'], 0.99)),
+                'buckets': {
+                    _bucket_label(self.bounds, i): count
+                    for i, count in enumerate(s['counts']) if count
+                }
+            })
+        return {
+            'bucket_bounds_ms': self.bounds,
+            'routes': routes
+        }
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (seconds, cumulative buckets)"""
+        name = 'http_request_duration_seconds'
+        lines = [
+            f'# HELP {name} Request latency by method, route and status.',
+            f'# TYPE {name} histogram'
+        ]
+
+        for (method, route, status), s in sorted(self.snapshot().items()):
+            labels = f'method="{_escape(method)}",route="{_escape(route)}",status="{status}"'
+            cumulative = 0
+            for i, count in enumerate(s['counts']):
+                cumulative += count
+                le = '+Inf' if i >= len(self.bounds) else repr(self.bounds[i] / 1000.0)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{labels}}} {s["sum"] / 1000.0!r}')
+            lines.append(f'{name}_count{{{labels}}} {s["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+def _bucket_label(bounds, index):
+    return '+Inf' if index >= len(bounds) else f'le_{bounds[index]:g}'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def get_request_metrics(app):
+    return app.extensions.get('request_metrics')
@@ -0,0 +1,71 @@
+"""
+Request Phase Timing
+Accumulates per-request time spent in each phase (auth, chaos, db,
+serialize, log) and formats it as a Server-Timing response header.
+(serialize is charged by FastJSONProvider in app/utils/json_provider.py.)
+"""
+
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context
+from sqlalchemy import event
+
+
+def start_request_timing():
+    """Reset the phase accumulators for a new request"""
+    g.timings = {}
+    g.db_queries = 0
+
+
+def add_timing(phase, ms):
+    """Add `ms` milliseconds to a phase of the current request (no-op outside requests)"""
+    if not has_request_context() or not hasattr(g, 'timings'):
+        return
+    g.timings[phase] = g.timings.get(phase, 0.0) + ms
+
+
+@contextmanager
+def timed(phase):
+    """Time a block as part of a request phase"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(phase, (time.perf_counter() - start) * 1000)
+
+
+def current_timings():
+    """Copy of the phase timings so far, rounded to 0.01ms"""
+    if not has_request_context() or not hasattr(g, 'timings'):
+        return {}
+    return {phase: round(ms, 2) for phase, ms in g.timings.items()}
+
+
+def server_timing_header(total_ms=None):
+    """Server-Timing header value, e.g. 'auth;dur=92.1, db;dur=1.4;desc="3 queries"'"""
+    parts = []
+    for phase, ms in current_timings().items():
+        entry = f'{phase};dur={ms}'
+        if phase == 'db':
+            entry += f';desc="{g.db_queries} queries"'
+        parts.append(entry)
+    if total_ms is not None:
+        parts.append(f'total;dur={round(total_ms, 2)}')
+    return ', '.join(parts)
+
+
+def instrument_engine(engine):
+    """Count SQL time on this engine towards the 'db' phase of the current request"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info['query_start'].pop()
+        # Background threads (log writer, retention) have no request to charge
+        if has_request_context() and hasattr(g, 'timings'):
+            add_timing('db', (time.perf_counter() - start) * 1000)
+            g.db_queries += 1
+
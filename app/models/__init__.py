@@ -1,5 +1,6 @@
 from .user import User
 from .todo import Todo
 from .request_log import RequestLog
+from .log_body import LogBody
 
-__all__ = ['User', 'Todo', 'RequestLog']
+__all__ = ['User', 'Todo', 'RequestLog', 'LogBody']
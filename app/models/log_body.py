@@ -0,0 +1,89 @@
+import hashlib
+import zlib
+from app import db
+
+class LogBody(db.Model):
+    """Compressed request/response body, stored once per distinct content"""
+    __tablename__ = 'request_log_bodies'
+    __bind_key__ = 'logs'
+
+    hash = db.Column(db.String(64), primary_key=True)  # sha256 of the raw text
+    data = db.Column(db.LargeBinary, nullable=False)   # zlib-compressed text
+    size = db.Column(db.Integer)                       # uncompressed bytes
+
+    @property
+    def text(self):
+        """Decompressed body text"""
+        return self.decompress(self.data)
+
+    @staticmethod
+    def decompress(data):
+        """Body text from stored (compressed) data"""
+        return zlib.decompress(data).decode('utf-8')
+
+    @staticmethod
+    def digest(text):
+        """Content address of a body"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def store(cls, texts):
+        """
+        Store bodies that aren't stored yet and return their hashes.
+
+        Takes a list of body strings (or None) and returns a list of the same
+        length with hashes (or None). Identical bodies are compressed and
+        written once; bodies already in the table are left alone.
+        Runs in the caller's transaction.
+        """
+        hashes = []
+        rows = {}
+
+        for text in texts:
+            if text is None:
+                hashes.append(None)
+                continue
+
+            digest = cls.digest(text)
+            hashes.append(digest)
+
+            if digest not in rows:
+                raw = text.encode('utf-8')
+                rows[digest] = {
+                    'hash': digest,
+                    'data': zlib.compress(raw),
+                    'size': len(raw)
+                }
+
+        if rows:
+            cls._insert_missing(list(rows.values()))
+
+        return hashes
+
+    @classmethod
+    def _insert_missing(cls, rows):
+        """Insert rows, skipping hashes that already exist"""
+        dialect = db.session.get_bind(mapper=cls.__mapper__).dialect.name
+
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            insert = None
+
+        if insert is not None:
+            stmt = insert(cls).on_conflict_do_nothing(index_elements=['hash'])
+            db.session.execute(stmt, rows)
+            return
+
+        # Generic fallback: look up which hashes exist first
+        existing = set(db.session.scalars(
+            db.select(cls.hash).where(cls.hash.in_([row['hash'] for row in rows]))
+        ))
+        missing = [row for row in rows if row['hash'] not in existing]
+        if missing:
+            db.session.execute(db.insert(cls), missing)
+
+    def __repr__(self):
+        return f'<LogBody {self.hash[:12]} ({self.size} bytes)>'
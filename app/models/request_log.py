@@ -1,21 +1,79 @@
+import json
 from datetime import datetime
 from app import db
 
 class RequestLog(db.Model):
     """Request log model for tracking API calls"""
     __tablename__ = 'request_logs'
+    __bind_key__ = 'logs'
+    __table_args__ = (
+        # Keyset pagination (newest first) for /api/admin/logs and its filters
+        db.Index('ix_request_logs_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_request_logs_method_timestamp_id', 'method', 'timestamp', 'id'),
+        db.Index('ix_request_logs_status_timestamp_id', 'status_code', 'timestamp', 'id'),
+        db.Index('ix_request_logs_path_timestamp_id', 'path', 'timestamp', 'id'),
+    )
+    
+    # Fields to_dict() returns (and table exports can pick from)
+    FIELDS = ('id', 'method', 'path', 'route', 'status_code', 'latency_ms', 'request_body', 'response_body',
+              'auth_method', 'user_id', 'ip_address', 'sample_weight', 'timings', 'timestamp')
     
     id = db.Column(db.Integer, primary_key=True)
     method = db.Column(db.String(10), nullable=False)
     path = db.Column(db.String(500), nullable=False)
+    route = db.Column(db.String(500))  # path template, e.g. /api/todos/<id>
     status_code = db.Column(db.Integer, nullable=False)
     latency_ms = db.Column(db.Integer)
+    request_body_hash = db.Column(db.String(64), db.ForeignKey('request_log_bodies.hash'), index=True)
+    response_body_hash = db.Column(db.String(64), db.ForeignKey('request_log_bodies.hash'), index=True)
+    # Legacy inline bodies (rows written before bodies were deduplicated;
+    # moved into request_log_bodies by migrate_logs.py)
     request_body = db.Column(db.Text)
     response_body = db.Column(db.Text)
     auth_method = db.Column(db.String(20))  # 'basic', 'token', or 'none'
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    user_id = db.Column(db.Integer)  # users.id (different bind, so no foreign key)
     ip_address = db.Column(db.String(45))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    sample_weight = db.Column(db.Float, default=1.0)  # 1 / keep probability
+    timings = db.Column(db.Text)  # JSON phase timings in ms (REQUEST_LOG_STORE_TIMINGS)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships (selectin: one extra query per page of logs, not per row)
+    request_body_blob = db.relationship('LogBody', foreign_keys=[request_body_hash], lazy='selectin')
+    response_body_blob = db.relationship('LogBody', foreign_keys=[response_body_hash], lazy='selectin')
+    
+    @property
+    def request_body_text(self):
+        """Request body, decompressed"""
+        if self.request_body_blob is not None:
+            return self.request_body_blob.text
+        return self.request_body
+    
+    @property
+    def response_body_text(self):
+        """Response body, decompressed"""
+        if self.response_body_blob is not None:
+            return self.response_body_blob.text
+        return self.response_body
+    
+    @classmethod
+    def insert_many(cls, records):
+        """
+        Bulk insert log records (dicts of column values).
+        
+        Raw 'request_body' / 'response_body' text is moved into LogBody and
+        replaced by its hash. Runs in the caller's transaction.
+        """
+        from app.models.log_body import LogBody
+        
+        rows = [dict(record) for record in records]
+        request_hashes = LogBody.store([row.pop('request_body', None) for row in rows])
+        response_hashes = LogBody.store([row.pop('response_body', None) for row in rows])
+        
+        for row, request_hash, response_hash in zip(rows, request_hashes, response_hashes):
+            row['request_body_hash'] = request_hash
+            row['response_body_hash'] = response_hash
+        
+        db.session.execute(db.insert(cls), rows)
     
     def to_dict(self):
         """Convert to dictionary for JSON response"""
@@ -23,15 +81,38 @@ class RequestLog(db.Model):
             'id': self.id,
             'method': self.method,
             'path': self.path,
+            'route': self.route,
             'status_code': self.status_code,
             'latency_ms': self.latency_ms,
-            'request_body': self.request_body,
-            'response_body': self.response_body,
+            'request_body': self.request_body_text,
+            'response_body': self.response_body_text,
             'auth_method': self.auth_method,
             'user_id': self.user_id,
             'ip_address': self.ip_address,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None
+            'sample_weight': self.sample_weight,
+            'timings': json.loads(self.timings) if self.timings else None,
+            'timestamp': self.timestamp
         }
     
+    @classmethod
+    def serialize(cls, values, fields=None):
+        """
+        to_dict() from plain column values. Each body comes as its compressed
+        LogBody data ('request_body_data' / 'response_body_data') next to the
+        legacy inline column.
+        """
+        from app.models.log_body import LogBody
+        
+        data = {}
+        for field in fields or cls.FIELDS:
+            if field in ('request_body', 'response_body'):
+                compressed = values[field + '_data']
+                data[field] = LogBody.decompress(compressed) if compressed is not None else values[field]
+            elif field == 'timings':
+                data[field] = json.loads(values[field]) if values[field] else None
+            else:
+                data[field] = values[field]
+        return data
+    
     def __repr__(self):
         return f'<RequestLog {self.method} {self.path}>'
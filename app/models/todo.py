@@ -4,6 +4,16 @@ from app import db
 class Todo(db.Model):
     """Todo model for task management"""
     __tablename__ = 'todos'
+    __table_args__ = (
+        # A user's todos in page order (keyset pagination, per-user counts)
+        db.Index('ix_todos_user_created', 'user_id', 'created_at', 'id'),
+        # GET /api/todos?completed=... and ?sort=updated_at / updated_* ranges
+        db.Index('ix_todos_user_completed_created', 'user_id', 'completed', 'created_at'),
+        db.Index('ix_todos_user_updated', 'user_id', 'updated_at'),
+    )
+    
+    # Fields to_dict() can return (and ?fields= can pick from)
+    FIELDS = ('id', 'title', 'description', 'completed', 'user_id', 'owner_email', 'created_at', 'updated_at')
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
@@ -13,18 +23,20 @@ class Todo(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self):
-        """Convert to dictionary for JSON response"""
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'completed': self.completed,
-            'user_id': self.user_id,
-            'owner_email': self.owner.email if self.owner else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    def to_dict(self, fields=None):
+        """Convert to dictionary for JSON response (only `fields`, if given)"""
+        data = {}
+        for field in fields or self.FIELDS:
+            if field == 'owner_email':
+                data[field] = self.owner.email if self.owner else None
+            else:
+                data[field] = getattr(self, field)
+        return data
+    
+    @classmethod
+    def serialize(cls, values, fields=None):
+        """to_dict() from plain column values (a mapping that includes owner_email)"""
+        return {field: values[field] for field in fields or cls.FIELDS}
     
     def __repr__(self):
         return f'<Todo {self.title}>'
@@ -1,15 +1,22 @@
+import hashlib
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
 from app import db
+from app.utils.credential_cache import credential_cache
+from app.utils.password_hasher import password_hasher
 
 class User(db.Model):
     """User model for authentication"""
     __tablename__ = 'users'
     
+    # Fields to_dict() returns (and table exports can pick from)
+    FIELDS = ('id', 'email', 'role', 'created_at', 'updated_at')
+    
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(255), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), default='user')  # 'user' or 'admin'
+    token_generation = db.Column(db.Integer, default=0)  # bumped to revoke issued JWTs
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -18,11 +25,31 @@ class User(db.Model):
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
+        if self.id is not None:
+            credential_cache.invalidate_user(self.id)
+    
+    @property
+    def password_version(self):
+        """Short fingerprint of the password hash (changes whenever the password does)"""
+        return hashlib.sha256(self.password_hash.encode('utf-8')).hexdigest()[:16]
     
     def check_password(self, password):
-        """Verify password against hash"""
-        return check_password_hash(self.password_hash, password)
+        """
+        Verify password against hash.
+        A hash made with an outdated method/cost is replaced on success;
+        the caller commits it.
+        """
+        if not password_hasher.verify(self.password_hash, password):
+            return False
+        
+        if password_hasher.needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
+    
+    def revoke_tokens(self):
+        """Invalidate every JWT issued to this user so far"""
+        self.token_generation = (self.token_generation or 0) + 1
     
     def to_dict(self):
         """Convert to dictionary for JSON response"""
@@ -30,9 +57,21 @@ class User(db.Model):
             'id': self.id,
             'email': self.email,
             'role': self.role,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
     
+    @classmethod
+    def serialize(cls, values, fields=None):
+        """to_dict() from plain column values"""
+        return {field: values[field] for field in fields or cls.FIELDS}
+    
     def __repr__(self):
         return f'<User {self.email}>'
+
+@event.listens_for(User, 'before_update')
+def revoke_tokens_on_role_change(mapper, connection, target):
+    """Tokens carry the role as a claim, so a role change has to retire them"""
+    history = db.inspect(target).attrs.role.history
+    if history.deleted and history.added and history.deleted[0] != history.added[0]:
+        target.revoke_tokens()
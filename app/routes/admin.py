@@ -1,36 +1,50 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+import hmac
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from flask_jwt_extended import jwt_required, verify_jwt_in_request
 from app import db
-from app.models import User, Todo, RequestLog
+from app.models import User, RequestLog
 from app.utils.seed import reset_database
+from app.middleware.log_writer import get_log_writer
+from app.utils.log_retention import get_log_retention
+from app.middleware.metrics import get_request_metrics
+from app.middleware.auth import get_current_user, get_current_role
+from app.utils.credential_cache import credential_cache
+from app.utils.identity_cache import identity_cache
+from app.utils.password_hasher import password_hasher
+from app.utils.log_analytics import summarize_logs
+from app.utils.pagination import encode_cursor, decode_cursor, InvalidCursor, parse_datetime, prefix_range
+from app.utils.json_stream import Page, iter_rows, stream_json
+from app.utils.table_export import TABLES, FORMATS, export_response
 
 bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
 def require_admin():
-    """Helper to check if current user is admin"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    """Helper to check if current user is admin (decided from the token's role claim)"""
+    role = get_current_role()
     
-    if not user:
+    if role is None:
         return None, jsonify({
             'error': 'User not found',
             'code': 'USER_NOT_FOUND'
         }), 404
     
-    if user.role != 'admin':
+    if role != 'admin':
         return None, jsonify({
             'error': 'Admin access required',
             'code': 'ADMIN_REQUIRED',
             'hint': 'This endpoint requires admin role'
         }), 403
     
-    return user, None, None
+    return get_current_user(), None, None
 
 @bp.route('/users', methods=['GET'])
 @jwt_required()
 def get_users():
     """
-    Get all users (admin only).
+    Get all users (admin only), streamed.
     
     Response:
         {
@@ -42,38 +56,64 @@ def get_users():
     if error:
         return error, status
     
-    users = User.query.all()
+    users = Page(iter_rows(db.select(User).order_by(User.id), scalars=True))
     
-    return jsonify({
-        'data': [u.to_dict() for u in users],
-        'count': len(users)
-    }), 200
+    return stream_json(
+        'data',
+        (u.to_dict() for u in users),
+        tail=lambda: {'count': users.count}
+    )
 
 @bp.route('/logs', methods=['GET'])
 @jwt_required()
 def get_logs():
     """
-    Get request logs (admin only).
+    Get request logs, newest first (admin only).
     
     Query Parameters:
-        limit: Maximum number of logs (default: 100)
+        limit: Maximum number of logs per page (default: 100, max: 1000)
+        cursor: next_cursor from the previous page
         method: Filter by HTTP method (GET, POST, etc.)
         status: Filter by status code
+        path_prefix: Filter by path prefix (e.g. /api/todos)
+        since / until: Filter by timestamp (ISO 8601, until is exclusive)
+        min_latency: Filter by minimum latency in ms
     
     Response:
         {
             "data": [...],
-            "count": 23
+            "count": 23,
+            "weighted_count": 41.0,
+            "next_cursor": "WyIy..." (null on the last page)
         }
+    
+    Rows may be sampled; weighted_count sums each row's sample_weight
+    to estimate how many requests the returned rows represent.
+    
+    Pages are keyset-paginated on (timestamp, id), so every page costs
+    the same no matter how deep it is.
     """
     user, error, status = require_admin()
     if error:
         return error, status
     
     # Get query parameters
-    limit = request.args.get('limit', 100, type=int)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    cursor = request.args.get('cursor', None)
     method = request.args.get('method', None)
     status_code = request.args.get('status', None, type=int)
+    path_prefix = request.args.get('path_prefix', None)
+    min_latency = request.args.get('min_latency', None, type=int)
+    
+    try:
+        since = parse_datetime(request.args.get('since', None))
+        until = parse_datetime(request.args.get('until', None))
+    except ValueError as e:
+        return jsonify({
+            'error': str(e),
+            'code': 'INVALID_DATE',
+            'hint': 'Use ISO 8601, e.g. 2025-01-31T12:00:00'
+        }), 400
     
     # Build query
     query = RequestLog.query
@@ -84,24 +124,335 @@ def get_logs():
     if status_code:
         query = query.filter_by(status_code=status_code)
     
-    # Order by newest first and limit
-    logs = query.order_by(RequestLog.timestamp.desc()).limit(limit).all()
+    if path_prefix:
+        query = query.filter(prefix_range(RequestLog.path, path_prefix))
+    
+    if since:
+        query = query.filter(RequestLog.timestamp >= since)
+    
+    if until:
+        query = query.filter(RequestLog.timestamp < until)
+    
+    if min_latency is not None:
+        query = query.filter(RequestLog.latency_ms >= min_latency)
+    
+    if cursor:
+        try:
+            last_timestamp, last_id = decode_cursor(cursor, datetime, int)
+        except InvalidCursor:
+            return jsonify({
+                'error': 'Invalid cursor',
+                'code': 'INVALID_CURSOR',
+                'hint': 'Pass next_cursor from the previous page unchanged'
+            }), 400
+        query = query.filter(db.tuple_(RequestLog.timestamp, RequestLog.id) < (last_timestamp, last_id))
+    
+    # Order by newest first; fetch one extra row to know if there's a next page
+    logs = query.order_by(RequestLog.timestamp.desc(), RequestLog.id.desc()).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(logs) > limit:
+        logs = logs[:limit]
+        next_cursor = encode_cursor(logs[-1].timestamp, logs[-1].id)
     
     return jsonify({
         'data': [log.to_dict() for log in logs],
-        'count': len(logs)
+        'count': len(logs),
+        'weighted_count': sum(log.sample_weight or 1.0 for log in logs),
+        'next_cursor': next_cursor
+    }), 200
+
+@bp.route('/logs/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_logs():
+    """
+    Live tail of request logs as Server-Sent Events.
+    For learning purposes, any authenticated user can watch the logs.
+    
+    Auth: Bearer header, or ?jwt=<token> (EventSource can't set headers).
+    
+    Query Parameters:
+        backlog: Recent logs to send first on a fresh connection (default: 100, max: 1000)
+    
+    Headers:
+        Last-Event-ID: Resume after this log id (sent by EventSource on reconnect)
+    
+    Events:
+        event: log    id: <log id>    data: {...log...}
+        event: reset  (logs were cleared - drop what you have)
+    
+    Each poll only reads rows newer than the last id sent. The stream ends after
+    LOG_STREAM_MAX_SECONDS and EventSource reconnects where it left off.
+    
+    A live stream holds a worker thread, so only LOG_STREAM_MAX_CLIENTS run at
+    once per process. Other connections get what's new in one response and a
+    longer retry: EventSource then polls (id > Last-Event-ID) instead.
+    """
+    last_id = request.headers.get('Last-Event-ID', None, type=int)
+    backlog = min(max(request.args.get('backlog', 100, type=int), 0), 1000)
+    poll_seconds = current_app.config['LOG_STREAM_POLL_SECONDS']
+    max_seconds = current_app.config['LOG_STREAM_MAX_SECONDS']
+    fallback_retry_ms = int(current_app.config['LOG_STREAM_FALLBACK_RETRY_SECONDS'] * 1000)
+    slots = current_app.extensions.setdefault(
+        'log_stream_slots', threading.BoundedSemaphore(current_app.config['LOG_STREAM_MAX_CLIENTS'])
+    )
+    
+    def event(name, data, event_id=None):
+        lines = [f'id: {event_id}'] if event_id is not None else []
+        lines += [f'event: {name}', f'data: {current_app.json.dumps(data)}']
+        return '\n'.join(lines) + '\n\n'
+    
+    def new_events():
+        """Events for logs newer than last_id (or a reset if the table was cleared)"""
+        nonlocal last_id
+        logs = (
+            RequestLog.query
+            .filter(RequestLog.id > last_id)
+            .order_by(RequestLog.id)
+            .limit(500)
+            .all()
+        )
+        
+        for log in logs:
+            yield event('log', log.to_dict(), log.id)
+            last_id = log.id
+        
+        if not logs and last_id:
+            # Ids restart after the table is cleared (reset / purge of everything)
+            newest = db.session.scalar(db.select(db.func.max(RequestLog.id))) or 0
+            if newest < last_id:
+                last_id = 0
+                yield event('reset', {}, 0)
+        
+        # End the read transaction so the next poll sees new rows
+        db.session.remove()
+    
+    def events():
+        nonlocal last_id
+        # Taken here rather than in the view: this generator's finally only
+        # runs once it has started
+        live = slots.acquire(blocking=False)
+        try:
+            yield f'retry: {1000 if live else fallback_retry_ms}\n\n'
+            
+            # Fresh connection: start with the most recent logs
+            if last_id is None:
+                recent = RequestLog.query.order_by(RequestLog.id.desc()).limit(backlog).all()
+                for log in reversed(recent):
+                    yield event('log', log.to_dict(), log.id)
+                last_id = recent[0].id if recent else db.session.scalar(db.select(db.func.max(RequestLog.id))) or 0
+                db.session.remove()
+            
+            if not live:
+                # Too many live streams: one batch, then the browser polls again
+                yield from new_events()
+                return
+            
+            deadline = time.monotonic() + max_seconds
+            last_sent = time.monotonic()
+            
+            while time.monotonic() < deadline:
+                for chunk in new_events():
+                    yield chunk
+                    last_sent = time.monotonic()
+                
+                if time.monotonic() - last_sent > 15:
+                    yield ': keepalive\n\n'
+                    last_sent = time.monotonic()
+                
+                time.sleep(poll_seconds)
+        finally:
+            if live:
+                slots.release()
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Don't let proxies buffer the stream
+        }
+    )
+
+@bp.route('/logs/analytics', methods=['GET'])
+@jwt_required()
+def get_log_analytics():
+    """
+    Get request log aggregates computed in the database (admin only).
+    
+    Query Parameters:
+        since / until: Time window (ISO 8601, default: last 24 hours)
+        top: Number of slowest routes to return (default: 5, max: 50)
+    
+    Response:
+        {
+            "window": {"since": "...", "until": "..."},
+            "totals": {"requests": 1200, "errors": 31, "error_rate": 0.0258, ...},
+            "routes": [
+                {"method": "GET", "route": "/api/todos/<id>", "requests": 310,
+                 "error_rate": 0.0323, "p50_ms": 4, "p95_ms": 18, "p99_ms": 40, ...}
+            ],
+            "slowest": [{"method": "POST", "route": "/api/auth/login", "p95_ms": 210, ...}]
+        }
+    """
+    user, error, status = require_admin()
+    if error:
+        return error, status
+    
+    top = min(max(request.args.get('top', 5, type=int), 1), 50)
+    
+    try:
+        until = parse_datetime(request.args.get('until', None)) or datetime.utcnow()
+        since = parse_datetime(request.args.get('since', None)) or until - timedelta(hours=24)
+    except ValueError as e:
+        return jsonify({
+            'error': str(e),
+            'code': 'INVALID_DATE',
+            'hint': 'Use ISO 8601, e.g. 2025-01-31T12:00:00'
+        }), 400
+    
+    return jsonify(summarize_logs(since, until, top=top)), 200
+
+@bp.route('/logs/stats', methods=['GET'])
+@jwt_required()
+def get_log_stats():
+    """
+    Get background log writer and sampler counters (admin only).
+    
+    Response:
+        {
+            "async": true,
+            "writer": {"queue_depth": 0, "dropped": 0, ...},
+            "sampler": {"kept": 120, "dropped": 3, "backoff": 1.0, ...},
+            "retention": {"max_rows": 100000, "reclaimed": {...}, ...}
+        }
+    """
+    user, error, status = require_admin()
+    if error:
+        return error, status
+    
+    writer = get_log_writer(current_app)
+    sampler = current_app.extensions.get('request_log_sampler')
+    retention = get_log_retention(current_app)
+    
+    return jsonify({
+        'async': writer is not None,
+        'writer': writer.stats() if writer else None,
+        'sampler': sampler.stats() if sampler else None,
+        'retention': retention.stats() if retention else None
+    }), 200
+
+@bp.route('/logs/purge', methods=['POST'])
+@jwt_required()
+def purge_logs():
+    """
+    Run the request log retention purge now (admin only).
+    Deletes logs past the configured max age / max row count.
+    
+    Response:
+        {
+            "reclaimed": {"expired": 120, "excess": 0, "bodies": 37}
+        }
+    """
+    user, error, status = require_admin()
+    if error:
+        return error, status
+    
+    retention = get_log_retention(current_app)
+    if not retention or not retention.enabled:
+        return jsonify({
+            'error': 'Log retention is disabled',
+            'code': 'RETENTION_DISABLED',
+            'hint': 'Set REQUEST_LOG_MAX_AGE_HOURS or REQUEST_LOG_MAX_ROWS'
+        }), 400
+    
+    return jsonify({
+        'reclaimed': retention.purge()
+    }), 200
+
+@bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Get per-route latency histograms (admin only).
+    Served from memory - no database reads.
+    
+    Auth: admin JWT, or `Authorization: Bearer <METRICS_TOKEN>` for scrapers.
+    
+    Query Parameters:
+        format: json (default) or prometheus
+    
+    Response (json):
+        {
+            "bucket_bounds_ms": [0.25, 0.5, ...],
+            "routes": [
+                {"method": "GET", "route": "/api/todos", "status": 200,
+                 "count": 42, "p50_ms": 3.1, "p95_ms": 9.8, "p99_ms": 14.2, ...}
+            ]
+        }
+    """
+    metrics_token = current_app.config.get('METRICS_TOKEN')
+    auth_header = request.headers.get('Authorization', '')
+    
+    if not (metrics_token and hmac.compare_digest(auth_header, f'Bearer {metrics_token}')):
+        verify_jwt_in_request()
+        user, error, status = require_admin()
+        if error:
+            return error, status
+    
+    metrics = get_request_metrics(current_app)
+    output = request.args.get('format', 'json').lower()
+    
+    if output == 'prometheus':
+        return Response(metrics.to_prometheus(), mimetype='text/plain; version=0.0.4')
+    
+    if output != 'json':
+        return jsonify({
+            'error': f'Invalid format: {output}',
+            'code': 'INVALID_FORMAT',
+            'valid_formats': ['json', 'prometheus']
+        }), 400
+    
+    return jsonify(metrics.to_json()), 200
+
+@bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    """
+    Get in-process auth cache and password hashing counters (admin only).
+    
+    Response:
+        {
+            "credentials": {"size": 3, "hits": 120, "misses": 4, "hit_rate": 0.9677, ...},
+            "users": {"size": 2, "hits": 310, "misses": 2, "hit_rate": 0.9936, ...},
+            "password_hashing": {"method": "scrypt:32768:8:1", "workers": 2, "completed": 6, "rejected": 0, ...}
+        }
+    """
+    user, error, status = require_admin()
+    if error:
+        return error, status
+    
+    return jsonify({
+        'credentials': credential_cache.stats(),
+        'users': identity_cache.stats(),
+        'password_hashing': password_hasher.stats()
     }), 200
 
 @bp.route('/db/tables/<table_name>', methods=['GET'])
 @jwt_required()
 def get_table_data(table_name):
     """
-    Get all data from a specific table.
+    Get all data from a specific table, streamed straight from the database
+    cursor (constant memory, even for the whole of request_logs).
     For learning purposes, any authenticated user can view database tables.
     
     Supported tables: todos, users, request_logs
     
-    Response:
+    Query Parameters:
+        format: json (default), ndjson (one row per line) or csv
+        columns: Comma-separated columns to export (default: all; id is always included)
+        after_id: Only rows after this id - resumes an interrupted export
+    
+    Response (json):
         {
             "table": "todos",
             "rows": [...],
@@ -111,28 +462,47 @@ def get_table_data(table_name):
     # Allow any authenticated user to view database (learning platform)
     # No admin check needed
     
-    # Map table names to models
-    tables = {
-        'todos': Todo,
-        'users': User,
-        'request_logs': RequestLog
-    }
-    
-    if table_name not in tables:
+    if table_name not in TABLES:
         return jsonify({
             'error': f'Invalid table name: {table_name}',
             'code': 'INVALID_TABLE',
-            'valid_tables': list(tables.keys())
+            'valid_tables': list(TABLES.keys())
         }), 400
     
-    model = tables[table_name]
-    rows = model.query.all()
+    output = request.args.get('format', 'json').lower()
+    if output not in FORMATS:
+        return jsonify({
+            'error': f'Invalid format: {output}',
+            'code': 'INVALID_FORMAT',
+            'hint': f"Use one of: {', '.join(FORMATS)}"
+        }), 400
     
-    return jsonify({
-        'table': table_name,
-        'rows': [row.to_dict() for row in rows],
-        'count': len(rows)
-    }), 200
+    valid_columns = TABLES[table_name].FIELDS
+    columns = list(valid_columns)
+    if request.args.get('columns'):
+        requested = [c.strip() for c in request.args['columns'].split(',') if c.strip()]
+        unknown = [c for c in requested if c not in valid_columns]
+        if unknown or not requested:
+            return jsonify({
+                'error': f"Unknown column(s): {', '.join(unknown)}" if unknown else 'No columns requested',
+                'code': 'INVALID_COLUMNS',
+                'valid_columns': list(valid_columns)
+            }), 400
+        # id first, so every row says where to resume from
+        columns = ['id'] + [c for c in dict.fromkeys(requested) if c != 'id']
+    
+    after_id = request.args.get('after_id', None)
+    if after_id is not None:
+        try:
+            after_id = int(after_id)
+        except ValueError:
+            return jsonify({
+                'error': f'Invalid after_id: {after_id}',
+                'code': 'INVALID_AFTER_ID',
+                'hint': 'Pass the id of the last row you received, e.g. after_id=1500'
+            }), 400
+    
+    return export_response(table_name, columns, output, after_id)
 
 @bp.route('/reset', methods=['POST'])
 @jwt_required()
@@ -171,8 +541,7 @@ def reset_db():
     """
     # Allow any authenticated user to reset (this is a learning sandbox)
     # In production, you would use: require_admin()
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user:
         return jsonify({
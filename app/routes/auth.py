@@ -91,9 +91,16 @@ def login():
             'hint': 'Check your email and password'
         }), 401
     
-    # Create access token (identity must be a string)
+    # check_password may have upgraded an outdated hash
+    if db.session.is_modified(user):
+        db.session.commit()
+    
+    # Create access token (identity must be a string). The role lets admin
+    # checks skip the database; gen ties the token to the user's current
+    # token_generation so a role change or revocation retires it.
     access_token = create_access_token(
         identity=str(user.id),
+        additional_claims={'role': user.role, 'gen': user.token_generation or 0},
         expires_delta=timedelta(hours=24)
     )
     
@@ -116,12 +123,12 @@ def get_current_user():
             "user": {...}
         }
     """
-    from flask_jwt_extended import jwt_required, get_jwt_identity
+    from flask_jwt_extended import jwt_required
+    from app.middleware.auth import load_current_user
     
     @jwt_required()
     def _get_current_user():
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = load_current_user()
         
         if not user:
             return jsonify({
@@ -15,5 +15,5 @@ def health():
     return {
         'status': 'healthy',
         'database': 'connected',
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': datetime.utcnow()
     }, 200
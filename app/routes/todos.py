@@ -1,11 +1,17 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
-from app import db, basic_auth
-from app.models import Todo, User
-import base64
+from datetime import datetime
+from itertools import groupby
+from flask import Blueprint, request, jsonify, current_app
+from app import db
+from app.models import Todo
+from app.middleware.auth import get_current_user
+from app.utils.pagination import encode_cursor, decode_cursor, InvalidCursor, parse_datetime
+from app.utils.todo_search import get_todo_search, search_terms
 
 bp = Blueprint('todos', __name__, url_prefix='/api/todos')
 
+# ?sort= values for GET /api/todos ('-' = newest first, rank = best ?q= match first)
+SORTS = ('created_at', '-created_at', 'updated_at', '-updated_at', 'rank')
+
 @bp.errorhandler(405)
 def method_not_allowed(e):
     """
@@ -32,47 +38,11 @@ def method_not_allowed(e):
         'hint': hints[0] if hints else f'{method} is not supported for this endpoint',
         'allowed_methods': {
             '/api/todos': ['GET', 'POST'],
-            '/api/todos/:id': ['GET', 'PUT', 'PATCH', 'DELETE']
+            '/api/todos/:id': ['GET', 'PUT', 'PATCH', 'DELETE'],
+            '/api/todos/bulk': ['POST']
         }
     }), 405
 
-def get_authenticated_user():
-    """
-    Get authenticated user from either JWT token or Basic Auth.
-    Returns User object or None if not authenticated.
-    """
-    auth_header = request.headers.get('Authorization', '')
-    
-    # Try JWT first
-    if auth_header.startswith('Bearer '):
-        try:
-            verify_jwt_in_request(optional=False)
-            user_id_str = get_jwt_identity()
-            if user_id_str:
-                user_id = int(user_id_str)  # Convert string back to int
-                user = User.query.get(user_id)
-                if user:
-                    return user
-        except:
-            pass
-    
-    # Try Basic Auth
-    if auth_header.startswith('Basic '):
-        try:
-            # Decode Basic Auth credentials
-            encoded_credentials = auth_header.replace('Basic ', '')
-            decoded = base64.b64decode(encoded_credentials).decode('utf-8')
-            email, password = decoded.split(':', 1)
-            
-            # Verify credentials
-            user = User.query.filter_by(email=email).first()
-            if user and user.check_password(password):
-                return user
-        except:
-            pass
-    
-    return None
-
 @bp.route('', methods=['GET'])
 def get_todos():
     """
@@ -81,39 +51,101 @@ def get_todos():
     tags:
       - Todos
     summary: Get all todos
-    description: Returns all todos for the authenticated user. Supports both Basic Auth and JWT Token Auth.
+    description: |
+      Returns the authenticated user's todos (oldest first unless sorted), one page at a time.
+      Pass next_cursor back as ?cursor= for the next page. Supports both Basic Auth and JWT Token Auth.
     security:
       - Bearer: []
       - BasicAuth: []
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        default: 100
+        description: Todos per page (max 1000)
+      - in: query
+        name: cursor
+        type: string
+        description: next_cursor from the previous page
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated fields to return, e.g. id,title,completed
+      - in: query
+        name: q
+        type: string
+        description: Full-text search over title and description (all words must match)
+      - in: query
+        name: sort
+        type: string
+        enum: [created_at, -created_at, updated_at, -updated_at, rank]
+        default: created_at (rank when searching)
+        description: Sort order ('-' for newest first, rank for best search match first)
+      - in: query
+        name: completed
+        type: boolean
+        description: Only completed (true) or open (false) todos
+      - in: query
+        name: created_since
+        type: string
+        format: date-time
+        description: Created at or after (ISO 8601)
+      - in: query
+        name: created_until
+        type: string
+        format: date-time
+        description: Created before (ISO 8601)
+      - in: query
+        name: updated_since
+        type: string
+        format: date-time
+        description: Updated at or after (ISO 8601)
+      - in: query
+        name: updated_until
+        type: string
+        format: date-time
+        description: Updated before (ISO 8601)
     responses:
       200:
-        description: List of todos
+        description: A page of todos
         schema:
-          type: array
-          items:
-            type: object
-            properties:
-              id:
-                type: integer
-                example: 1
-              title:
-                type: string
-                example: "Buy groceries"
-              description:
-                type: string
-                example: "Milk, eggs, bread"
-              completed:
-                type: boolean
-                example: false
-              owner_id:
-                type: integer
-                example: 1
-              created_at:
-                type: string
-                format: date-time
-              updated_at:
-                type: string
-                format: date-time
+          type: object
+          properties:
+            count:
+              type: integer
+              description: Todos on this page
+            total:
+              type: integer
+              description: All of the user's todos
+            next_cursor:
+              type: string
+              description: Cursor for the next page (null on the last page)
+            data:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                    example: 1
+                  title:
+                    type: string
+                    example: "Buy groceries"
+                  description:
+                    type: string
+                    example: "Milk, eggs, bread"
+                  completed:
+                    type: boolean
+                    example: false
+                  owner_id:
+                    type: integer
+                    example: 1
+                  created_at:
+                    type: string
+                    format: date-time
+                  updated_at:
+                    type: string
+                    format: date-time
       401:
         description: Unauthorized - Authentication required
         schema:
@@ -123,7 +155,7 @@ def get_todos():
               type: string
               example: "Authentication required"
     """
-    user = get_authenticated_user()
+    user = get_current_user()
     
     if not user:
         return jsonify({
@@ -132,11 +164,148 @@ def get_todos():
             'hint': 'Use Basic Auth (email:password) or Bearer token'
         }), 401
     
-    todos = Todo.query.filter_by(user_id=user.id).all()
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    cursor = request.args.get('cursor', None)
+    q = request.args.get('q', '').strip()
+    sort = request.args.get('sort', 'rank' if q else 'created_at')
+    completed = request.args.get('completed', None)
+    
+    fields = None
+    if request.args.get('fields'):
+        fields = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+        unknown = [f for f in fields if f not in Todo.FIELDS]
+        if unknown or not fields:
+            return jsonify({
+                'error': f"Unknown field(s): {', '.join(unknown)}" if unknown else 'No fields requested',
+                'code': 'INVALID_FIELDS',
+                'valid_fields': list(Todo.FIELDS)
+            }), 400
+    
+    if sort not in SORTS:
+        return jsonify({
+            'error': f'Invalid sort: {sort}',
+            'code': 'INVALID_SORT',
+            'valid_sorts': list(SORTS)
+        }), 400
+    
+    if sort == 'rank' and not q:
+        return jsonify({
+            'error': 'sort=rank needs a search',
+            'code': 'INVALID_SORT',
+            'hint': 'Add ?q=<words> or pick another sort'
+        }), 400
+    sort_column = getattr(Todo, sort.lstrip('-')) if sort != 'rank' else None
+    descending = sort.startswith('-')
+    
+    terms = search_terms(q)
+    if q and not terms:
+        return jsonify({
+            'error': 'Search query has no words in it',
+            'code': 'INVALID_QUERY',
+            'hint': 'Search for words from todo titles or descriptions, e.g. ?q=groceries'
+        }), 400
+    
+    if completed is not None and completed.lower() not in ('true', 'false'):
+        return jsonify({
+            'error': f'Invalid completed filter: {completed}',
+            'code': 'INVALID_FILTER',
+            'hint': 'Use completed=true or completed=false'
+        }), 400
+    
+    try:
+        ranges = {
+            name: parse_datetime(request.args.get(name, None))
+            for name in ('created_since', 'created_until', 'updated_since', 'updated_until')
+        }
+    except ValueError as e:
+        return jsonify({
+            'error': str(e),
+            'code': 'INVALID_DATE',
+            'hint': 'Use ISO 8601, e.g. 2025-01-31T12:00:00'
+        }), 400
+    
+    # Plain column tuples rather than ORM objects: only the requested columns
+    # (plus the sort key for the cursor), and owner_email is the caller's own
+    columns = {'id'} | ({sort_column.key} if sort_column is not None else set())
+    columns |= {f for f in fields or Todo.FIELDS if f != 'owner_email'}
+    query = db.select(
+        *(Todo.__table__.c[name] for name in columns),
+        db.literal(user.email).label('owner_email')
+    )
+    
+    # Filters (each combination is served by one of the todos indexes)
+    query = query.filter(Todo.user_id == user.id)
+    
+    if completed is not None:
+        query = query.filter(Todo.completed == (completed.lower() == 'true'))
+    
+    if ranges['created_since']:
+        query = query.filter(Todo.created_at >= ranges['created_since'])
+    
+    if ranges['created_until']:
+        query = query.filter(Todo.created_at < ranges['created_until'])
+    
+    if ranges['updated_since']:
+        query = query.filter(Todo.updated_at >= ranges['updated_since'])
+    
+    if ranges['updated_until']:
+        query = query.filter(Todo.updated_at < ranges['updated_until'])
+    
+    if terms:
+        query, rank = get_todo_search(current_app).filter(query, terms)
+    
+    # Separate count of everything matching the filters
+    total = db.session.scalar(query.with_only_columns(db.func.count(Todo.id)))
+    
+    if cursor:
+        try:
+            cursor_sort, last_value, last_id = decode_cursor(cursor, str, (datetime, int), (int, type(None)))
+            if cursor_sort != sort:
+                raise InvalidCursor(cursor)
+            # rank pages by offset (no id); the others by (timestamp, id)
+            if sort == 'rank':
+                valid = isinstance(last_value, int) and last_id is None
+            else:
+                valid = isinstance(last_value, datetime) and isinstance(last_id, int)
+            if not valid:
+                raise InvalidCursor(cursor)
+        except InvalidCursor:
+            return jsonify({
+                'error': 'Invalid cursor',
+                'code': 'INVALID_CURSOR',
+                'hint': 'Pass next_cursor from the previous page unchanged, with the same sort'
+            }), 400
+    
+    if sort == 'rank':
+        # Ranked search results page by offset (ranks have no stable keyset)
+        offset = last_value if cursor else 0
+        query = query.order_by(rank, Todo.id).offset(offset)
+    else:
+        if cursor:
+            after = db.tuple_(sort_column, Todo.id)
+            query = query.filter(after < (last_value, last_id) if descending else after > (last_value, last_id))
+        
+        if descending:
+            query = query.order_by(sort_column.desc(), Todo.id.desc())
+        else:
+            query = query.order_by(sort_column, Todo.id)
+    
+    # Fetch one extra row to know if there's a next page
+    rows = db.session.execute(query.limit(limit + 1)).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if sort == 'rank':
+            next_cursor = encode_cursor(sort, offset + limit, None)
+        else:
+            next_cursor = encode_cursor(sort, getattr(rows[-1], sort_column.key), rows[-1].id)
     
     return jsonify({
-        'data': [todo.to_dict() for todo in todos],
-        'count': len(todos)
+        'data': [Todo.serialize(row._mapping, fields) for row in rows],
+        'count': len(rows),
+        'total': total,
+        'next_cursor': next_cursor
     }), 200
 
 @bp.route('/<int:todo_id>', methods=['GET'])
@@ -189,7 +358,7 @@ def get_todo(todo_id):
       404:
         description: Todo not found
     """
-    user = get_authenticated_user()
+    user = get_current_user()
     
     if not user:
         return jsonify({
@@ -280,7 +449,7 @@ def create_todo():
       422:
         description: Validation error (missing title or too long)
     """
-    user = get_authenticated_user()
+    user = get_current_user()
     
     if not user:
         return jsonify({
@@ -331,6 +500,44 @@ def create_todo():
         'data': todo.to_dict()
     }), 201
 
+def _write_owned_todo(statement, todo_id, user):
+    """
+    Run an UPDATE/DELETE against one of the user's todos and commit.
+    Returns the todo's data (as to_dict() would) or None if no row matched.
+    Uses RETURNING where the database supports it, else reads the row back.
+    """
+    statement = statement.where(Todo.id == todo_id, Todo.user_id == user.id)
+    statement = statement.execution_options(synchronize_session=False)
+    is_update = statement.is_update
+    
+    if db.engine.dialect.update_returning if is_update else db.engine.dialect.delete_returning:
+        row = db.session.execute(statement.returning(*Todo.__table__.columns)).first()
+        db.session.commit()
+        return Todo.serialize({**row._mapping, 'owner_email': user.email}) if row else None
+    
+    if db.session.execute(statement).rowcount == 0:
+        db.session.rollback()
+        return None
+    db.session.commit()
+    
+    if not is_update:
+        return {'id': todo_id}
+    row = db.session.execute(db.select(*Todo.__table__.columns).where(Todo.id == todo_id)).first()
+    return Todo.serialize({**row._mapping, 'owner_email': user.email})
+
+def _missing_or_forbidden(todo_id, action):
+    """404 or 403 response for a todo the user couldn't write"""
+    if db.session.scalar(db.select(Todo.id).where(Todo.id == todo_id)) is None:
+        return jsonify({
+            'error': 'Todo not found',
+            'code': 'TODO_NOT_FOUND'
+        }), 404
+    
+    return jsonify({
+        'error': f'You do not have permission to {action} this todo',
+        'code': 'FORBIDDEN'
+    }), 403
+
 @bp.route('/<int:todo_id>', methods=['PUT', 'PATCH'])
 def update_todo(todo_id):
     """
@@ -402,7 +609,7 @@ def update_todo(todo_id):
       422:
         description: Validation error
     """
-    user = get_authenticated_user()
+    user = get_current_user()
     
     if not user:
         return jsonify({
@@ -410,21 +617,6 @@ def update_todo(todo_id):
             'code': 'AUTH_REQUIRED'
         }), 401
     
-    todo = Todo.query.get(todo_id)
-    
-    if not todo:
-        return jsonify({
-            'error': 'Todo not found',
-            'code': 'TODO_NOT_FOUND'
-        }), 404
-    
-    # Check ownership
-    if todo.user_id != user.id:
-        return jsonify({
-            'error': 'You do not have permission to update this todo',
-            'code': 'FORBIDDEN'
-        }), 403
-    
     data = request.get_json()
     
     if not data:
@@ -434,6 +626,8 @@ def update_todo(todo_id):
         }), 400
     
     # Update fields
+    values = {}
+    
     if 'title' in data:
         title = data['title'].strip()
         if not title:
@@ -444,18 +638,23 @@ def update_todo(todo_id):
                     'title': 'Title cannot be empty'
                 }
             }), 422
-        todo.title = title
+        values['title'] = title
     
     if 'description' in data:
-        todo.description = data['description']
+        values['description'] = data['description']
     
     if 'completed' in data:
-        todo.completed = bool(data['completed'])
+        values['completed'] = bool(data['completed'])
     
-    db.session.commit()
+    values['updated_at'] = datetime.utcnow()
+    
+    # One ownership-scoped UPDATE; only a miss needs a second look to tell 404 from 403
+    todo = _write_owned_todo(db.update(Todo).values(**values), todo_id, user)
+    if todo is None:
+        return _missing_or_forbidden(todo_id, 'update')
     
     return jsonify({
-        'data': todo.to_dict()
+        'data': todo
     }), 200
 
 @bp.route('/<int:todo_id>', methods=['DELETE'])
@@ -487,7 +686,7 @@ def delete_todo(todo_id):
       404:
         description: Todo not found
     """
-    user = get_authenticated_user()
+    user = get_current_user()
     
     if not user:
         return jsonify({
@@ -495,22 +694,223 @@ def delete_todo(todo_id):
             'code': 'AUTH_REQUIRED'
         }), 401
     
-    todo = Todo.query.get(todo_id)
+    if _write_owned_todo(db.delete(Todo), todo_id, user) is None:
+        return _missing_or_forbidden(todo_id, 'delete')
     
-    if not todo:
+    return '', 204
+
+def _validate_bulk_item(item, action):
+    """Field errors for one bulk item ({} when valid)"""
+    if action == 'delete':
+        return {} if isinstance(item, int) and not isinstance(item, bool) else {'id': 'Must be a todo ID (integer)'}
+    
+    if not isinstance(item, dict):
+        return {'item': 'Must be an object'}
+    
+    errors = {}
+    if action == 'update' and (not isinstance(item.get('id'), int) or isinstance(item.get('id'), bool)):
+        errors['id'] = 'Todo ID (integer) is required'
+    
+    if action == 'create' or 'title' in item:
+        title = item.get('title')
+        if not isinstance(title, str) or not title.strip():
+            errors['title'] = 'Title is required' if action == 'create' else 'Title cannot be empty'
+        elif len(title.strip()) > 255:
+            errors['title'] = 'Title must be 255 characters or less'
+    
+    if item.get('description') is not None and not isinstance(item['description'], str):
+        errors['description'] = 'Description must be a string'
+    
+    if 'completed' in item and not isinstance(item['completed'], bool):
+        errors['completed'] = 'Completed must be true or false'
+    
+    if action == 'update' and not set(item) & {'title', 'description', 'completed'}:
+        errors['item'] = 'Nothing to update (send title, description and/or completed)'
+    
+    return errors
+
+@bp.route('/bulk', methods=['POST'])
+def bulk_todos():
+    """
+    Create, update and delete many todos in one request
+    ---
+    tags:
+      - Todos
+    summary: Bulk create/update/delete todos
+    description: |
+      Applies every operation in one transaction. The whole request is validated first
+      (any invalid item rejects it with 422). Updates and deletes of todos that don't exist
+      or aren't yours are reported per item (404/403) and skipped; the rest are applied.
+    security:
+      - Bearer: []
+      - BasicAuth: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            create:
+              type: array
+              items:
+                type: object
+                example: {"title": "Buy milk", "description": "2 liters", "completed": false}
+            update:
+              type: array
+              items:
+                type: object
+                example: {"id": 5, "completed": true}
+            delete:
+              type: array
+              items:
+                type: integer
+              example: [7, 8]
+    responses:
+      200:
+        description: Per-item results, in request order
+        schema:
+          type: object
+          properties:
+            results:
+              type: object
+              example: {"create": [{"id": 12, "status": 201}], "update": [{"id": 5, "status": 200}], "delete": [{"id": 7, "status": 204}, {"id": 8, "status": 404, "code": "TODO_NOT_FOUND"}]}
+            counts:
+              type: object
+              example: {"created": 1, "updated": 1, "deleted": 1, "failed": 1}
+      400:
+        description: Missing or malformed body, or too many items
+      401:
+        description: Authentication required
+      422:
+        description: Validation failed (nothing was applied)
+    """
+    user = get_current_user()
+    
+    if not user:
         return jsonify({
-            'error': 'Todo not found',
-            'code': 'TODO_NOT_FOUND'
-        }), 404
+            'error': 'Authentication required',
+            'code': 'AUTH_REQUIRED'
+        }), 401
     
-    # Check ownership
-    if todo.user_id != user.id:
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or not any(data.get(action) for action in ('create', 'update', 'delete')):
         return jsonify({
-            'error': 'You do not have permission to delete this todo',
-            'code': 'FORBIDDEN'
-        }), 403
+            'error': 'Request body is required',
+            'code': 'NO_DATA',
+            'hint': 'Send {"create": [...], "update": [...], "delete": [...]}'
+        }), 400
+    
+    batch = {action: data.get(action) or [] for action in ('create', 'update', 'delete')}
+    
+    if not all(isinstance(items, list) for items in batch.values()):
+        return jsonify({
+            'error': 'create, update and delete must be arrays',
+            'code': 'INVALID_BULK_REQUEST'
+        }), 400
+    
+    max_items = current_app.config['TODO_BULK_MAX_ITEMS']
+    if sum(len(items) for items in batch.values()) > max_items:
+        return jsonify({
+            'error': f'Too many items (max {max_items} per request)',
+            'code': 'BULK_TOO_LARGE',
+            'hint': 'Split the request into smaller batches'
+        }), 400
+    
+    # Validate everything before touching the database
+    errors = {}
+    for action, items in batch.items():
+        item_errors = {i: e for i, item in enumerate(items) if (e := _validate_bulk_item(item, action))}
+        if item_errors:
+            errors[action] = item_errors
+    
+    update_ids = [item['id'] for item in batch['update'] if not errors.get('update')]
+    target_ids = update_ids + batch['delete']
+    if not errors and len(set(target_ids)) != len(target_ids):
+        errors['ids'] = 'Each todo ID may appear only once across update and delete'
+    
+    if errors:
+        return jsonify({
+            'error': 'Validation failed',
+            'code': 'VALIDATION_ERROR',
+            'items': errors
+        }), 422
+    
+    # Ownership of every referenced todo in one query
+    owners = dict(db.session.execute(
+        db.select(Todo.id, Todo.user_id).where(Todo.id.in_(target_ids))
+    ).all()) if target_ids else {}
+    
+    def check(todo_id):
+        if todo_id not in owners:
+            return {'id': todo_id, 'status': 404, 'code': 'TODO_NOT_FOUND'}
+        if owners[todo_id] != user.id:
+            return {'id': todo_id, 'status': 403, 'code': 'FORBIDDEN'}
+        return None
+    
+    results = {'create': [], 'update': [], 'delete': []}
+    
+    # Creates: multi-row INSERT ... RETURNING in batches (same keys on every row
+    # keeps them batchable). New ids are handed out in row order, so sorting the
+    # returned ids lines them up with the request - asking the driver to keep
+    # parameter order instead falls back to one INSERT per row on SQLite.
+    if batch['create']:
+        rows = [{
+            'title': item['title'].strip(),
+            'description': item.get('description', ''),
+            'completed': item.get('completed', False),
+            'user_id': user.id
+        } for item in batch['create']]
+        new_ids = sorted(db.session.scalars(db.insert(Todo).returning(Todo.id), rows).all())
+        results['create'] = [{'id': todo_id, 'status': 201} for todo_id in new_ids]
+    
+    # Updates: executemany per set of changed fields, still scoped to this user
+    patches = []
+    for item in batch['update']:
+        failure = check(item['id'])
+        results['update'].append(failure or {'id': item['id'], 'status': 200})
+        if failure:
+            continue
+        patch = {'id': item['id']}
+        if 'title' in item:
+            patch['title'] = item['title'].strip()
+        if 'description' in item:
+            patch['description'] = item['description']
+        if 'completed' in item:
+            patch['completed'] = item['completed']
+        patches.append(patch)
+    
+    patches.sort(key=lambda patch: sorted(patch))
+    for _, group in groupby(patches, key=lambda patch: sorted(patch)):
+        db.session.execute(
+            db.update(Todo).where(Todo.user_id == user.id).execution_options(synchronize_session=None),
+            list(group)
+        )
+    
+    # Deletes: a single DELETE ... WHERE id IN (...)
+    delete_ids = []
+    for todo_id in batch['delete']:
+        failure = check(todo_id)
+        results['delete'].append(failure or {'id': todo_id, 'status': 204})
+        if not failure:
+            delete_ids.append(todo_id)
+    
+    if delete_ids:
+        db.session.execute(
+            db.delete(Todo).where(Todo.id.in_(delete_ids), Todo.user_id == user.id)
+            .execution_options(synchronize_session=False)
+        )
     
-    db.session.delete(todo)
     db.session.commit()
     
-    return '', 204
+    failed = sum(1 for items in results.values() for r in items if r['status'] >= 400)
+    return jsonify({
+        'results': results,
+        'counts': {
+            'created': len(results['create']),
+            'updated': len(patches),
+            'deleted': len(delete_ids),
+            'failed': failed
+        }
+    }), 200
@@ -0,0 +1,100 @@
+"""
+Verified Credential Cache
+Remembers recent successful Basic Auth verifications so repeated requests
+with the same email/password skip the (deliberately slow) password hash.
+
+Entries are keyed by an HMAC of (email, password) under a random per-process
+key, so no plaintext credentials are kept. Each entry also records the
+user's password hash at verification time; a changed hash never matches.
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+class CredentialCache:
+    """Bounded LRU + TTL cache of successful (email, password) verifications"""
+
+    def __init__(self, max_size=1024, ttl_seconds=300):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._key = secrets.token_bytes(32)
+        self._entries = OrderedDict()  # digest -> (user_id, password_version, expires_at)
+        self._lock = threading.Lock()
+
+        # Counters (read via stats())
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_size = app.config['CREDENTIAL_CACHE_SIZE']
+        self.ttl = app.config['CREDENTIAL_CACHE_TTL_SECONDS']
+        self.clear()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    def digest(self, email, password):
+        """Keyed hash of the credentials (the cache key)"""
+        message = email.encode('utf-8') + b'\0' + password.encode('utf-8')
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def lookup(self, digest, user):
+        """True if these credentials were verified for `user` (a User or UserIdentity) with its current password"""
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry and entry[0] == user.id and entry[1] == user.password_version and entry[2] > time.monotonic():
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return True
+
+            if entry:
+                del self._entries[digest]
+            self.misses += 1
+            return False
+
+    def store(self, digest, user):
+        """Remember a successful verification"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[digest] = (user.id, user.password_version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        """Forget every cached verification for a user (e.g. password change)"""
+        with self._lock:
+            stale = [digest for digest, entry in self._entries.items() if entry[0] == user_id]
+            for digest in stale:
+                del self._entries[digest]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Snapshot of cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None
+            }
+
+
+credential_cache = CredentialCache()
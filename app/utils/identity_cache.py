@@ -0,0 +1,153 @@
+"""
+User Identity Cache
+Read-through, in-process cache of compact user snapshots, so authenticated
+requests don't reload a users row that almost never changes.
+
+Entries are dropped when a User is updated or deleted in this process
+(at flush, and again when the change commits) and on reset_database().
+Other worker processes only notice after the TTL, so keep it short.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+UserIdentity = namedtuple('UserIdentity', ['id', 'email', 'role', 'password_version', 'token_generation'])
+
+
+class IdentityCache:
+    """Bounded LRU + TTL cache of UserIdentity snapshots by id (and email)"""
+
+    def __init__(self, max_size=1024, ttl_seconds=60):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()  # user id -> (UserIdentity, expires_at)
+        self._ids_by_email = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation: a row loaded before one isn't cached
+        self._generation = 0
+
+        # Counters (read via stats())
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_size = app.config['IDENTITY_CACHE_SIZE']
+        self.ttl = app.config['IDENTITY_CACHE_TTL_SECONDS']
+        self.clear()
+
+        from app.models import User
+        if not event.contains(User, 'after_update', self._on_user_changed):
+            event.listen(User, 'after_update', self._on_user_changed)
+            event.listen(User, 'after_delete', self._on_user_changed)
+            event.listen(Session, 'after_commit', self._on_commit)
+            event.listen(Session, 'after_rollback', self._on_rollback)
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, user_id):
+        """UserIdentity for an id (loading it on a miss), or None if no such user"""
+        identity = self._cached(user_id)
+        if identity is not None:
+            return identity
+
+        from app.models import User
+        generation = self._generation
+        return self._remember(User.query.get(user_id), generation)
+
+    def get_by_email(self, email):
+        """UserIdentity for an email (loading it on a miss), or None if no such user"""
+        with self._lock:
+            user_id = self._ids_by_email.get(email)
+
+        identity = self._cached(user_id) if user_id is not None else None
+        if identity is not None and identity.email == email:
+            return identity
+
+        from app.models import User
+        generation = self._generation
+        return self._remember(User.query.filter_by(email=email).first(), generation)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation += 1
+            entry = self._entries.pop(user_id, None)
+            if entry:
+                self._ids_by_email.pop(entry[0].email, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._ids_by_email.clear()
+
+    def stats(self):
+        """Snapshot of cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None
+            }
+
+    def _cached(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[1] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def _remember(self, user, generation):
+        if user is None:
+            return None
+
+        identity = UserIdentity(user.id, user.email, user.role, user.password_version, user.token_generation or 0)
+        if not self.enabled:
+            return identity
+
+        with self._lock:
+            if generation != self._generation:
+                # Invalidated while we were loading: the row may predate it
+                return identity
+
+            old = self._entries.pop(identity.id, None)
+            if old:
+                self._ids_by_email.pop(old[0].email, None)
+
+            self._entries[identity.id] = (identity, time.monotonic() + self.ttl)
+            self._ids_by_email[identity.email] = identity.id
+
+            while len(self._entries) > self.max_size:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._ids_by_email.pop(evicted.email, None)
+
+        return identity
+
+    def _on_user_changed(self, mapper, connection, target):
+        self.invalidate(target.id)
+        # Flushed, not committed: until the commit, other connections still
+        # read the old row and may cache it - so drop it again then
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault('changed_user_ids', set()).add(target.id)
+
+    def _on_commit(self, session):
+        for user_id in session.info.pop('changed_user_ids', ()):
+            self.invalidate(user_id)
+
+    def _on_rollback(self, session):
+        session.info.pop('changed_user_ids', None)
+
+
+identity_cache = IdentityCache()
@@ -0,0 +1,172 @@
+"""
+Streaming Responses
+Unbounded collections (all users, table exports) are sent as they are
+produced: rows come off the database cursor in batches (yield_per), each
+batch is encoded and sent as one chunk, and nothing holds the whole result.
+Memory stays flat however large the table is; the body goes out with chunked
+transfer encoding.
+
+The body is produced after the after_request hooks have run, so the request
+isn't finished when they see it. Hooks that need the whole request (request
+logging, latency metrics) register with on_stream_end() and are called after
+the last chunk, still inside the request context.
+"""
+
+from itertools import islice
+from flask import current_app, request, stream_with_context
+from app import db
+from app.middleware.timing import timed
+
+# Response bodies up to this size are kept for the request log
+BODY_CAPTURE_BYTES = 10000
+
+# on_stream_end() callbacks, kept with the request (g can outlive it)
+STREAM_END_KEY = 'apilab.stream_end'
+
+
+def iter_rows(statement, scalars=False, model=None):
+    """
+    Rows of `statement`, fetched from the cursor JSON_STREAM_BATCH_SIZE at a time
+    (each fetch counts towards the request's 'db' phase).
+    Nothing is executed until the first row is asked for.
+
+    model: the model whose bind (database) to run on - needed when `statement`
+    selects plain table columns, which otherwise always go to the default bind
+    """
+    statement = statement.execution_options(yield_per=current_app.config['JSON_STREAM_BATCH_SIZE'])
+    bind_arguments = {'mapper': model} if model is not None else None
+    if scalars:
+        result = db.session.scalars(statement, bind_arguments=bind_arguments)
+    else:
+        result = db.session.execute(statement, bind_arguments=bind_arguments)
+    try:
+        batches = result.partitions()
+        while True:
+            with timed('db'):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            yield from batch
+    finally:
+        result.close()
+
+
+def batched(items, size):
+    """Lists of up to `size` consecutive items"""
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+class Page:
+    """
+    The first `limit` of `rows` (query limit + 1 of them; all of them without a
+    limit), remembering what the envelope needs once they're sent: count, the
+    last row and whether more exist.
+    """
+
+    def __init__(self, rows, limit=None):
+        self.rows = rows
+        self.limit = limit
+        self.count = 0
+        self.last = None
+        self.has_more = False
+
+    def __iter__(self):
+        for row in self.rows:
+            if self.count == self.limit:
+                self.has_more = True
+                break
+            self.count += 1
+            self.last = row
+            yield row
+
+
+class StreamResult:
+    """What on_stream_end() callbacks learn about the body that was sent"""
+
+    def __init__(self):
+        self.size = 0
+        self.head = b''      # first BODY_CAPTURE_BYTES of the body
+        self.error = None    # exception that cut the body short, if any
+
+    @property
+    def body(self):
+        """The whole body as text, if it was small enough to keep"""
+        if self.size < BODY_CAPTURE_BYTES:
+            return self.head.decode('utf-8')
+        return None
+
+
+def on_stream_end(callback):
+    """
+    Call `callback(StreamResult)` once the current request's streamed body has
+    been sent. Returns False (and does nothing) if the response isn't one.
+    """
+    callbacks = request.environ.get(STREAM_END_KEY)
+    if callbacks is None:
+        return False
+    callbacks.append(callback)
+    return True
+
+
+def stream_response(chunks, mimetype, status=200, headers=None):
+    """
+    Streamed response with `chunks` (bytes, produced lazily) as its body.
+    Producing them counts towards the request's 'serialize' phase (which
+    then overlaps 'db' for the rows fetched along the way).
+    """
+    request.environ[STREAM_END_KEY] = []
+    result = StreamResult()
+
+    def generate():
+        try:
+            chunk_iter = iter(chunks)
+            while True:
+                with timed('serialize'):
+                    chunk = next(chunk_iter, None)
+                if chunk is None:
+                    break
+                if result.size < BODY_CAPTURE_BYTES:
+                    result.head += chunk[:BODY_CAPTURE_BYTES - result.size]
+                result.size += len(chunk)
+                yield chunk
+        except Exception as e:
+            result.error = e
+            raise
+        finally:
+            for callback in request.environ.pop(STREAM_END_KEY, []):
+                callback(result)
+
+    return current_app.response_class(
+        stream_with_context(generate()), status=status, mimetype=mimetype, headers=headers
+    )
+
+
+def stream_json(key, items, head=None, tail=None, status=200):
+    """
+    Stream {**head, key: [*items], **tail()} as a JSON response.
+
+    items: iterable of JSON-able values, consumed lazily
+    tail: called after the last item, for members that depend on them (counts)
+    """
+    provider = current_app.json
+    batch_size = current_app.config['JSON_STREAM_BATCH_SIZE']
+
+    def members(values):
+        """'"a":1,"b":2' for {'a': 1, 'b': 2}"""
+        return provider.encode(values)[1:-1] if values else b''
+
+    def chunks():
+        opening = members(head)
+        yield b'{' + opening + (b',' if opening else b'') + provider.encode(key) + b':['
+
+        separator = b''
+        for batch in batched(items, batch_size):
+            yield separator + provider.encode(batch)[1:-1]
+            separator = b','
+
+        closing = members(tail() if tail else None)
+        yield b']' + (b',' if closing else b'') + closing + b'}\n'
+
+    return stream_response(chunks(), provider.mimetype, status=status)
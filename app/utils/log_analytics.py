@@ -0,0 +1,107 @@
+from app import db
+from app.models import RequestLog
+
+PERCENTILES = (50, 95, 99)
+
+def summarize_logs(since, until, top=5):
+    """
+    Aggregate request logs in [since, until) inside the database.
+    
+    Returns totals plus, per (method, route template): request count,
+    sample-weighted estimate, error count/rate, average and p50/p95/p99
+    latency, and the `top` slowest routes by p95.
+    """
+    route = db.func.coalesce(RequestLog.route, RequestLog.path)
+    in_window = (RequestLog.timestamp >= since) & (RequestLog.timestamp < until)
+    is_error = db.case((RequestLog.status_code >= 400, 1), else_=0)
+    
+    # Counts per route
+    counts = db.session.execute(
+        db.select(
+            RequestLog.method,
+            route.label('route'),
+            db.func.count().label('requests'),
+            db.func.sum(db.func.coalesce(RequestLog.sample_weight, 1.0)).label('estimated'),
+            db.func.sum(is_error).label('errors'),
+            db.func.avg(RequestLog.latency_ms).label('avg_latency')
+        )
+        .where(in_window)
+        .group_by(RequestLog.method, route)
+    ).all()
+    
+    # Nearest-rank percentiles: number each route's latencies in order and
+    # pick the row at ceil(n * p / 100) - portable to any engine with
+    # window functions (SQLite 3.25+, Postgres, MySQL 8)
+    partition = (RequestLog.method, route)
+    ranked = (
+        db.select(
+            RequestLog.method.label('method'),
+            route.label('route'),
+            RequestLog.latency_ms.label('latency'),
+            db.func.row_number().over(partition_by=partition, order_by=RequestLog.latency_ms).label('rn'),
+            db.func.count().over(partition_by=partition).label('n')
+        )
+        .where(in_window)
+        .where(RequestLog.latency_ms.isnot(None))
+        .subquery()
+    )
+    
+    percentile_columns = [
+        db.func.max(
+            db.case((ranked.c.rn == (ranked.c.n * p + 99) // 100, ranked.c.latency))
+        ).label(f'p{p}')
+        for p in PERCENTILES
+    ]
+    percentiles = {
+        (row.method, row.route): row
+        for row in db.session.execute(
+            db.select(ranked.c.method, ranked.c.route, *percentile_columns)
+            .group_by(ranked.c.method, ranked.c.route)
+        )
+    }
+    
+    routes = []
+    for row in counts:
+        latency = percentiles.get((row.method, row.route))
+        routes.append({
+            'method': row.method,
+            'route': row.route,
+            'requests': row.requests,
+            'estimated_requests': round(row.estimated, 1),
+            'errors': row.errors,
+            'error_rate': round(row.errors / row.requests, 4),
+            'avg_latency_ms': round(row.avg_latency, 1) if row.avg_latency is not None else None,
+            **{
+                f'p{p}_ms': getattr(latency, f'p{p}') if latency else None
+                for p in PERCENTILES
+            }
+        })
+    
+    routes.sort(key=lambda r: r['requests'], reverse=True)
+    
+    slowest = sorted(
+        (r for r in routes if r['p95_ms'] is not None),
+        key=lambda r: r['p95_ms'],
+        reverse=True
+    )[:top]
+    
+    total_requests = sum(r['requests'] for r in routes)
+    total_errors = sum(r['errors'] for r in routes)
+    
+    return {
+        'window': {
+            'since': since,
+            'until': until
+        },
+        'totals': {
+            'requests': total_requests,
+            'estimated_requests': round(sum(r['estimated_requests'] for r in routes), 1),
+            'errors': total_errors,
+            'error_rate': round(total_errors / total_requests, 4) if total_requests else 0.0
+        },
+        'routes': routes,
+        'slowest': [
+            {'method': r['method'], 'route': r['route'], 'p95_ms': r['p95_ms'], 'p99_ms': r['p99_ms']}
+            for r in slowest
+        ]
+    }
@@ -0,0 +1,159 @@
+import zlib
+from app import db
+from app.models import RequestLog, LogBody
+from app.utils.paths import normalize_path
+
+def move_logs_to_bind(batch_size=1000):
+    """
+    Move request logs left in the main database (from before logs had their
+    own bind) into the logs database, then drop the old tables.
+    
+    Bodies are carried over (inline or from the old request_log_bodies) and
+    stored deduplicated. Ids are reassigned. Returns the number of rows moved.
+    """
+    source = db.engine
+    if source.url == db.engines['logs'].url:
+        return 0
+    
+    inspector = db.inspect(source)
+    if not inspector.has_table('request_logs'):
+        return 0
+    
+    metadata = db.MetaData()
+    old_logs = db.Table('request_logs', metadata, autoload_with=source)
+    old_bodies = None
+    if inspector.has_table('request_log_bodies'):
+        old_bodies = db.Table('request_log_bodies', metadata, autoload_with=source)
+    
+    copied_columns = [
+        column.name for column in RequestLog.__table__.columns
+        if column.name in old_logs.c and column.name not in (
+            'id', 'request_body', 'response_body', 'request_body_hash', 'response_body_hash'
+        )
+    ]
+    
+    moved = 0
+    last_id = 0
+    
+    with source.connect() as conn:
+        while True:
+            rows = conn.execute(
+                db.select(old_logs)
+                .where(old_logs.c.id > last_id)
+                .order_by(old_logs.c.id)
+                .limit(batch_size)
+            ).mappings().all()
+            
+            if not rows:
+                break
+            
+            # Old deduplicated bodies, fetched once per batch
+            stored = {}
+            if old_bodies is not None:
+                hashes = {
+                    row[key] for row in rows
+                    for key in ('request_body_hash', 'response_body_hash')
+                    if row.get(key)
+                }
+                if hashes:
+                    stored = {
+                        body.hash: zlib.decompress(body.data).decode('utf-8')
+                        for body in conn.execute(db.select(old_bodies).where(old_bodies.c.hash.in_(hashes)))
+                    }
+            
+            records = []
+            for row in rows:
+                record = {name: row[name] for name in copied_columns}
+                record['request_body'] = row.get('request_body') or stored.get(row.get('request_body_hash'))
+                record['response_body'] = row.get('response_body') or stored.get(row.get('response_body_hash'))
+                records.append(record)
+            
+            RequestLog.insert_many(records)
+            db.session.commit()
+            
+            moved += len(rows)
+            last_id = rows[-1]['id']
+    
+    old_logs.drop(source)
+    if old_bodies is not None:
+        old_bodies.drop(source)
+    
+    return moved
+
+def migrate_inline_bodies(batch_size=1000):
+    """
+    Move bodies stored inline on request_logs rows into request_log_bodies.
+    
+    Works through the table in id order, one transaction per batch, so it
+    can be stopped and re-run safely. Returns the number of rows migrated.
+    """
+    migrated = 0
+    last_id = 0
+    
+    while True:
+        rows = db.session.execute(
+            db.select(RequestLog.id, RequestLog.request_body, RequestLog.response_body)
+            .where(RequestLog.id > last_id)
+            .where(db.or_(RequestLog.request_body.isnot(None), RequestLog.response_body.isnot(None)))
+            .order_by(RequestLog.id)
+            .limit(batch_size)
+        ).all()
+        
+        if not rows:
+            break
+        
+        request_hashes = LogBody.store([row.request_body for row in rows])
+        response_hashes = LogBody.store([row.response_body for row in rows])
+        
+        db.session.execute(
+            db.update(RequestLog),
+            [
+                {
+                    'id': row.id,
+                    'request_body_hash': request_hash,
+                    'response_body_hash': response_hash,
+                    'request_body': None,
+                    'response_body': None
+                }
+                for row, request_hash, response_hash in zip(rows, request_hashes, response_hashes)
+            ]
+        )
+        db.session.commit()
+        
+        migrated += len(rows)
+        last_id = rows[-1].id
+    
+    return migrated
+
+def backfill_routes(batch_size=1000):
+    """
+    Fill in the route template of logs written before it was recorded.
+    
+    Uses the path with id-like segments replaced by <id>. Returns the
+    number of rows updated.
+    """
+    updated = 0
+    last_id = 0
+    
+    while True:
+        rows = db.session.execute(
+            db.select(RequestLog.id, RequestLog.path)
+            .where(RequestLog.id > last_id)
+            .where(RequestLog.route.is_(None))
+            .order_by(RequestLog.id)
+            .limit(batch_size)
+        ).all()
+        
+        if not rows:
+            break
+        
+        db.session.execute(
+            db.update(RequestLog),
+            [{'id': row.id, 'route': normalize_path(row.path)} for row in rows]
+        )
+        db.session.commit()
+        
+        updated += len(rows)
+        last_id = rows[-1].id
+    
+    return updated
@@ -0,0 +1,188 @@
+"""
+Request Log Retention
+Keeps request_logs bounded by age and row count, deleting in small
+batches from a background thread so no long write lock is held.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from app import db
+from app.models import RequestLog, LogBody
+
+
+class LogRetention:
+    """Batched purge of expired/excess request logs on a schedule"""
+
+    def __init__(self, app, max_age_hours=168, max_rows=100000, batch_size=500,
+                 interval_seconds=60, batch_pause_ms=10):
+        self.app = app
+        self.max_age_hours = max_age_hours
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.interval = interval_seconds
+        self.batch_pause = batch_pause_ms / 1000.0
+
+        self._lock = threading.Lock()
+        self._purge_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        # Counters (read via stats())
+        self.runs = 0
+        self.reclaimed = {'expired': 0, 'excess': 0, 'bodies': 0}
+        self.last_run = None
+        self.last_result = None
+
+    @property
+    def enabled(self):
+        return bool(self.max_age_hours or self.max_rows)
+
+    def purge(self):
+        """
+        Delete expired and excess logs plus bodies nothing references anymore.
+        Must run inside an app context. Returns rows reclaimed per category.
+        """
+        with self._purge_lock:
+            result = {'expired': 0, 'excess': 0, 'bodies': 0}
+
+            if self.max_age_hours:
+                cutoff = datetime.utcnow() - timedelta(hours=self.max_age_hours)
+                result['expired'] = self._delete_logs(RequestLog.timestamp < cutoff)
+
+            if self.max_rows:
+                # Id of the newest row that falls outside the cap
+                cutoff_id = db.session.scalar(
+                    db.select(RequestLog.id)
+                    .order_by(RequestLog.id.desc())
+                    .offset(self.max_rows)
+                    .limit(1)
+                )
+                if cutoff_id is not None:
+                    result['excess'] = self._delete_logs(RequestLog.id <= cutoff_id)
+
+            if result['expired'] or result['excess']:
+                result['bodies'] = self._delete_orphan_bodies()
+
+            with self._lock:
+                self.runs += 1
+                for key, value in result.items():
+                    self.reclaimed[key] += value
+                self.last_run = datetime.utcnow()
+                self.last_result = result
+
+            return result
+
+    def start(self):
+        """Start the scheduler (again after a fork, e.g. gunicorn workers)"""
+        if not self.enabled:
+            return
+        if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='request-log-retention',
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        """Snapshot of retention settings and counters"""
+        with self._lock:
+            return {
+                'max_age_hours': self.max_age_hours,
+                'max_rows': self.max_rows,
+                'interval_seconds': self.interval,
+                'runs': self.runs,
+                'reclaimed': dict(self.reclaimed),
+                'last_run': self.last_run,
+                'last_result': self.last_result
+            }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    self.purge()
+            except Exception as e:
+                print(f"⚠️  Request log purge failed: {e}")
+
+    def _delete_logs(self, condition):
+        """Delete matching logs, oldest first, one short transaction per batch"""
+        deleted = 0
+        while True:
+            ids = db.session.scalars(
+                db.select(RequestLog.id)
+                .where(condition)
+                .order_by(RequestLog.id)
+                .limit(self.batch_size)
+            ).all()
+            if not ids:
+                return deleted
+
+            db.session.execute(db.delete(RequestLog).where(RequestLog.id.in_(ids)))
+            db.session.commit()
+            deleted += len(ids)
+
+            # Let request-path writers grab the lock between batches
+            time.sleep(self.batch_pause)
+
+    def _delete_orphan_bodies(self):
+        """Delete stored bodies that no remaining log references"""
+        referenced_by_request = db.select(RequestLog.id).where(RequestLog.request_body_hash == LogBody.hash)
+        referenced_by_response = db.select(RequestLog.id).where(RequestLog.response_body_hash == LogBody.hash)
+
+        deleted = 0
+        while True:
+            hashes = db.session.scalars(
+                db.select(LogBody.hash)
+                .where(~referenced_by_request.exists())
+                .where(~referenced_by_response.exists())
+                .limit(self.batch_size)
+            ).all()
+            if not hashes:
+                return deleted
+
+            # Re-check in the DELETE itself: a writer may have just reused a body
+            result = db.session.execute(
+                db.delete(LogBody)
+                .where(LogBody.hash.in_(hashes))
+                .where(~referenced_by_request.exists())
+                .where(~referenced_by_response.exists())
+            )
+            db.session.commit()
+            deleted += result.rowcount
+            time.sleep(self.batch_pause)
+
+
+def init_log_retention(app):
+    """Create the retention scheduler; it starts with the first request in each process"""
+    retention = LogRetention(
+        app,
+        max_age_hours=app.config['REQUEST_LOG_MAX_AGE_HOURS'],
+        max_rows=app.config['REQUEST_LOG_MAX_ROWS'],
+        batch_size=app.config['REQUEST_LOG_PURGE_BATCH_SIZE'],
+        interval_seconds=app.config['REQUEST_LOG_PURGE_INTERVAL_SECONDS']
+    )
+    app.extensions['request_log_retention'] = retention
+
+    @app.before_request
+    def start_log_retention():
+        retention.start()
+
+    return retention
+
+
+def get_log_retention(app):
+    return app.extensions.get('request_log_retention')
@@ -0,0 +1,75 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+# Largest integer (id, offset) a cursor may carry - fits a 64-bit column
+MAX_CURSOR_INT = 2 ** 63 - 1
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor can't be decoded"""
+
+def encode_cursor(*values):
+    """
+    Encode the sort key of the last row on a page as an opaque cursor.
+    Datetimes are stored as ISO strings and restored by decode_cursor.
+    """
+    payload = [
+        {'dt': value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, *types):
+    """
+    Decode a cursor produced by encode_cursor into a tuple of values, one per
+    entry in `types` (the type, or tuple of types, that value must have).
+    
+    Anything else - wrong length, wrong types, integers outside 0..MAX_CURSOR_INT,
+    timezone-aware datetimes - raises InvalidCursor, so a tampered cursor is
+    a 400 rather than a database error.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(payload, list):
+            raise TypeError(payload)
+        values = tuple(
+            datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value
+            for value in payload
+        )
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+
+    if len(values) != len(types):
+        raise InvalidCursor(cursor)
+    
+    for value, expected in zip(values, types):
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise InvalidCursor(cursor)
+        if isinstance(value, int) and not 0 <= value <= MAX_CURSOR_INT:
+            raise InvalidCursor(cursor)
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            raise InvalidCursor(cursor)
+    return values
+
+def parse_datetime(value):
+    """Parse an ISO 8601 query parameter into naive UTC (None passes through)"""
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'Invalid date: {value}')
+
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def prefix_range(column, prefix):
+    """
+    Index-friendly `column LIKE 'prefix%'`: a plain range comparison, which
+    SQLite can answer from a B-tree index (case-insensitive LIKE can't).
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return (column >= prefix) & (column < upper)
@@ -0,0 +1,159 @@
+"""
+Password Hashing Pool
+Runs password hashing/verification on a small process pool so a burst of
+logins or uncached Basic Auth checks doesn't eat every request thread's CPU
+time in the worker.
+
+In-flight jobs are capped (workers + queue size); past that, callers get
+HasherBusy right away and the request fails fast with 503 instead of
+queueing behind seconds of hashing. PASSWORD_HASH_WORKERS=0 hashes inline.
+
+The hash method and cost come from config; hashes made with anything else
+are reported by needs_rehash() so they can be upgraded on the next login.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import jsonify
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+# fork keeps wsgi.py from being re-imported (and the app re-created) in each pool process
+START_METHOD = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+# Werkzeug's defaults: scrypt N (r=8, p=1) and PBKDF2-SHA256 iterations
+DEFAULT_COSTS = {'scrypt': 32768, 'pbkdf2': 600000}
+
+
+def hash_method(method='scrypt', cost=None):
+    """
+    Full werkzeug method string, e.g. ('scrypt', 16384) -> 'scrypt:16384:8:1'.
+    Raises ValueError for a method or cost hashing would fail with, so bad
+    config stops the app at startup rather than 500ing every login.
+    """
+    if method not in DEFAULT_COSTS:
+        raise ValueError(f"Unsupported password hash method: {method!r} (use one of {sorted(DEFAULT_COSTS)})")
+    cost = cost or DEFAULT_COSTS[method]
+    if isinstance(cost, bool) or not isinstance(cost, int) or cost < 1:
+        raise ValueError(f"Invalid password hash cost: {cost!r} (must be a positive integer)")
+    if method == 'scrypt' and (cost < 2 or cost & (cost - 1)):
+        raise ValueError(f"Invalid scrypt cost: {cost} (N must be a power of two above 1, e.g. 16384)")
+    if method == 'scrypt':
+        return f'scrypt:{cost}:8:1'
+    return f'pbkdf2:sha256:{cost}'
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+def _warm_up():
+    return os.getpid()
+
+
+class PasswordHasher:
+    """Hash/verify passwords inline or on a bounded process pool"""
+
+    def __init__(self, workers=0, queue_size=16, method=None):
+        self.method = method or hash_method()
+        self.workers = workers
+        self.queue_size = queue_size
+        self._slots = None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        # Counters (read via stats())
+        self.completed = 0
+        self.rejected = 0
+
+    def init_app(self, app):
+        self.method = hash_method(app.config['PASSWORD_HASH_METHOD'], app.config['PASSWORD_HASH_COST'])
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self.queue_size = app.config['PASSWORD_HASH_QUEUE_SIZE']
+        self.shutdown()
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size) if self.workers else None
+
+        app.register_error_handler(HasherBusy, self._busy_response)
+
+        # Fork the pool now, while this process has no request/background threads yet
+        if self.workers:
+            self._get_executor().submit(_warm_up).result()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if `pwhash` wasn't made with the configured method and cost"""
+        return pwhash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        """Snapshot of pool settings and counters"""
+        with self._lock:
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'completed': self.completed,
+                'rejected': self.rejected
+            }
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy()
+
+        try:
+            try:
+                result = self._get_executor().submit(fn, *args).result()
+            except BrokenProcessPool:
+                # A pool process died; start a fresh pool next time, answer this one inline
+                self.shutdown()
+                result = fn(*args)
+            with self._lock:
+                self.completed += 1
+            return result
+        finally:
+            self._slots.release()
+
+    def _get_executor(self):
+        with self._lock:
+            # A forked copy (e.g. gunicorn --preload) can't use the parent's pool
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(START_METHOD)
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    @staticmethod
+    def _busy_response(error):
+        response = jsonify({
+            'error': 'Server busy',
+            'code': 'PASSWORD_HASH_BUSY',
+            'hint': 'Too many password checks in flight - retry in a moment'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
+
+password_hasher = PasswordHasher()
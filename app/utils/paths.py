@@ -0,0 +1,30 @@
+import re
+
+# Flask rule placeholders: <int:todo_id>, <table_name>, <path:filename>, ...
+_RULE_PLACEHOLDER = re.compile(r'<(?:([^:<>]+):)?([^:<>]+)>')
+
+# Path segments that look like ids: 42, 3f2a9c.., uuids
+_ID_SEGMENT = re.compile(r'^(?:\d+|[0-9a-fA-F]{24,}|[0-9a-fA-F-]{36})$')
+
+def route_template(rule, path):
+    """
+    Group-by key for a request: /api/todos/5 -> /api/todos/<id>.
+    
+    Uses the matched Flask rule when there is one (numeric converters
+    become <id>, others keep their name), otherwise normalizes the path.
+    """
+    if rule is None:
+        return normalize_path(path)
+    
+    def placeholder(match):
+        converter, name = match.groups()
+        return '<id>' if converter in ('int', 'uuid') else f'<{name}>'
+    
+    return _RULE_PLACEHOLDER.sub(placeholder, rule)
+
+def normalize_path(path):
+    """Replace id-like path segments with <id> (for unmatched routes and old logs)"""
+    return '/'.join(
+        '<id>' if _ID_SEGMENT.match(segment) else segment
+        for segment in path.split('/')
+    )
@@ -0,0 +1,54 @@
+from sqlalchemy import event
+from app import db
+
+def set_sqlite_pragmas(engine, pragmas):
+    """Run PRAGMA statements on every new connection of a SQLite engine"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+def upgrade_schema():
+    """
+    Bring an existing database up to date with the models.
+
+    db.create_all() only creates missing tables, so databases created by an
+    older version would be missing newer columns and indexes. This adds them
+    in place (additive changes only - nothing is dropped or rewritten).
+    Covers every bind (e.g. the separate request logs database).
+    """
+    for bind_key, metadata in db.metadatas.items():
+        _upgrade_bind(db.engines[bind_key], metadata)
+
+def _upgrade_bind(engine, metadata):
+    inspector = db.inspect(engine)
+
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {col['name'] for col in inspector.get_columns(table.name)}
+
+        with engine.begin() as conn:
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+
+                col_type = column.type.compile(dialect=engine.dialect)
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'
+
+                # Scalar Python defaults become server defaults for existing rows
+                default = column.default.arg if column.default is not None else None
+                if isinstance(default, (int, float)) and not isinstance(default, bool):
+                    ddl += f' DEFAULT {default}'
+
+                conn.execute(db.text(ddl))
+                print(f"  ✓ Added column {table.name}.{column.name}")
+
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
@@ -78,7 +78,16 @@ def reset_database():
     print("🔄 Resetting database...")
     
     # Import RequestLog here to avoid circular imports
-    from app.models import RequestLog
+    from app.models import RequestLog, LogBody
+    from app.middleware.log_writer import get_log_writer
+    from flask import current_app
+    from app.utils.credential_cache import credential_cache
+    from app.utils.identity_cache import identity_cache
+    
+    # Let queued logs land first so they don't reappear after the reset
+    writer = get_log_writer(current_app)
+    if writer:
+        writer.flush()
     
     # Clear todos (all of them)
     Todo.query.delete()
@@ -86,8 +95,13 @@ def reset_database():
     
     # Clear request logs
     RequestLog.query.delete()
+    LogBody.query.delete()
     print("  ✓ Cleared request logs")
     
+    # Passwords are reset below; drop every cached verification and identity
+    credential_cache.clear()
+    identity_cache.clear()
+    
     # Ensure default users exist (don't delete users to prevent lockout)
     admin = User.query.filter_by(email='admin@apilab.dev').first()
     if not admin:
@@ -0,0 +1,92 @@
+"""
+Todo Full-Text Search
+GET /api/todos?q=... matches words in todo titles and descriptions.
+
+On SQLite (with FTS5) todos are indexed in the todos_fts virtual table, an
+external-content index over todos kept in sync by triggers, so every insert,
+update and delete - ORM or bulk SQL - is reflected without app code. Results
+rank by BM25. Other engines fall back to LIKE matching with a simple score
+(title hits count double).
+"""
+
+import re
+from sqlalchemy import case, column, literal_column, table
+from sqlalchemy.exc import OperationalError
+from app.models import Todo
+
+todos_fts = table('todos_fts', column('rowid'), column('rank'))
+
+FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(
+        title, description, content='todos', content_rowid='id', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF title, description ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def search_terms(q):
+    """Words to search for, e.g. 'buy "milk", eggs' -> ['buy', 'milk', 'eggs']"""
+    return re.findall(r'\w+', q)
+
+
+class TodoSearch:
+    """Restricts a Todo query to search matches (FTS5 or LIKE fallback)"""
+
+    def __init__(self, engine):
+        self.fts = engine.dialect.name == 'sqlite' and self._setup_fts(engine)
+
+    @staticmethod
+    def _setup_fts(engine):
+        try:
+            with engine.begin() as conn:
+                exists = conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'todos_fts'").first()
+                for ddl in FTS_SCHEMA:
+                    conn.exec_driver_sql(ddl)
+                if not exists:
+                    # Index the todos that were there before search existed
+                    conn.exec_driver_sql("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+        except OperationalError:
+            # SQLite built without FTS5
+            return False
+        return True
+
+    def filter(self, query, terms):
+        """
+        Restrict `query` to todos containing every term (as a word prefix).
+        Returns (query, rank) - order by rank ascending for best matches first.
+        """
+        if self.fts:
+            match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+            query = (query
+                     .join(todos_fts, todos_fts.c.rowid == Todo.id)
+                     .filter(literal_column('todos_fts').op('MATCH')(match)))
+            return query, todos_fts.c.rank
+
+        score = 0
+        for term in terms:
+            pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            in_title = Todo.title.ilike(pattern, escape='\\')
+            in_description = Todo.description.ilike(pattern, escape='\\')
+            query = query.filter(in_title | in_description)
+            score = score + case((in_title, 2), else_=0) + case((in_description, 1), else_=0)
+        return query, -score
+
+
+def init_todo_search(app, engine):
+    """Set up search for the todos table (call after db.create_all())"""
+    search = TodoSearch(engine)
+    app.extensions['todo_search'] = search
+    return search
+
+
+def get_todo_search(app):
+    return app.extensions['todo_search']
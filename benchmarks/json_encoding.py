@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON encoding/decoding of real API payloads, stdlib vs orjson.
+
+Payloads:
+    /api/todos      a full page (1000 todos, datetimes included) as the route builds it
+    /apispec.json   the Swagger spec flasgger serves
+
+Compares Flask's DefaultJSONProvider (stdlib json) with FastJSONProvider on
+its stdlib fallback and with orjson (if installed). Encoding uses the same
+settings as a production response (sorted keys, compact).
+
+Usage:
+    python benchmarks/json_encoding.py [rounds]    (default: 200)
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/json.db'
+    from flask.json.provider import DefaultJSONProvider
+    from app import create_app, db
+    from app.models import Todo, User
+    import app.utils.json_provider as json_provider
+
+    app = create_app('production')
+    fast = json_provider.FastJSONProvider(app)
+    stdlib = DefaultJSONProvider(app)
+
+    with app.app_context():
+        user = User.query.filter_by(email='testuser@apilab.dev').first()
+        db.session.execute(db.insert(Todo), [
+            {'title': f'Todo number {i}', 'description': 'Understand the basics of APIs and REST architecture',
+             'completed': i % 3 == 0, 'user_id': user.id}
+            for i in range(1000)
+        ])
+        db.session.commit()
+        rows = db.session.execute(
+            db.select(*Todo.__table__.columns, db.literal(user.email).label('owner_email'))
+            .where(Todo.user_id == user.id).order_by(Todo.created_at, Todo.id).limit(1000)
+        ).all()
+        payloads = {
+            '/api/todos': {'data': [Todo.serialize(row._mapping) for row in rows], 'count': len(rows),
+                           'total': len(rows), 'next_cursor': None},
+            '/apispec.json': app.test_client().get('/apispec.json').json,
+        }
+
+        # Flask's provider writes datetimes as HTTP dates, so it gets the payload the
+        # models used to build (isoformat() already applied, cost not counted here)
+        stdlib_payloads = {
+            name: stdlib.loads(fast.dumps(payload)) for name, payload in payloads.items()
+        }
+
+        print(f"orjson: {'installed' if json_provider.orjson else 'not installed'}, {rounds} rounds\n")
+        print(f"{'payload':<15} {'KiB':>6} {'encoder':<22} {'encode':>10} {'decode':>10}")
+
+        for name, payload in payloads.items():
+            encoded = fast.encode(payload)
+            candidates = [('flask default (json)', stdlib, stdlib_payloads[name])]
+            orjson_module = json_provider.orjson
+            json_provider.orjson = None
+            candidates.append(('fast, stdlib fallback', fast, payload))
+            if orjson_module:
+                candidates.append(('fast, orjson', fast, payload))
+
+            for label, provider, obj in candidates:
+                json_provider.orjson = orjson_module if label == 'fast, orjson' else None
+                if isinstance(provider, json_provider.FastJSONProvider):
+                    encode = lambda: provider.encode(obj)
+                else:
+                    encode = lambda: provider.dumps(obj, separators=(',', ':')).encode('utf-8')
+                encode_us = timeit.timeit(encode, number=rounds) / rounds * 1e6
+                decode_us = timeit.timeit(lambda: provider.loads(encoded), number=rounds) / rounds * 1e6
+                print(f"{name:<15} {len(encoded) / 1024:>6.1f} {label:<22} {encode_us:>8.0f}us {decode_us:>8.0f}us")
+            json_provider.orjson = orjson_module
+
+
+if __name__ == '__main__':
+    main()
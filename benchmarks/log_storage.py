@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: on-disk size of request_logs with inline vs deduplicated bodies.
+
+Builds a synthetic log (mostly repeated GET /api/todos responses, some unique
+POST bodies and a few error payloads) with bodies stored inline, measures the
+SQLite file, migrates the bodies into request_log_bodies, VACUUMs and
+measures again.
+
+Usage:
+    python benchmarks/log_storage.py [rows]    (default: 1,000,000)
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def todo_list_payload(variant):
+    """A GET /api/todos response body like the real one"""
+    todos = [
+        {
+            'id': i,
+            'title': f'Todo number {i}',
+            'description': 'Understand the basics of APIs and REST architecture',
+            'completed': i % 3 == 0,
+            'user_id': 2,
+            'owner_email': 'testuser@apilab.dev',
+            'created_at': '2025-01-01T12:00:00.000000',
+            'updated_at': '2025-01-01T12:00:00.000000'
+        }
+        for i in range(1, 6 + variant % 5)
+    ]
+    return json.dumps({'data': todos, 'count': len(todos)}, indent=2)
+
+def synthetic_rows(count):
+    """Yield request_logs rows with inline bodies"""
+    listings = [todo_list_payload(v) for v in range(20)]
+    errors = [
+        json.dumps({'error': 'Todo not found', 'code': 'TODO_NOT_FOUND'}, indent=2),
+        json.dumps({'error': 'Authentication required', 'code': 'AUTH_REQUIRED'}, indent=2)
+    ]
+    now = datetime.utcnow()
+
+    for i in range(count):
+        roll = random.random()
+        row = {
+            'method': 'GET', 'path': '/api/todos', 'status_code': 200,
+            'latency_ms': random.randint(1, 40), 'request_body': None,
+            'response_body': None, 'auth_method': 'basic', 'user_id': 2,
+            'ip_address': '127.0.0.1', 'sample_weight': 1.0, 'timestamp': now
+        }
+        if roll < 0.7:
+            row['response_body'] = random.choice(listings)
+        elif roll < 0.9:
+            body = json.dumps({'title': f'Imported todo {i}', 'completed': False})
+            row.update(method='POST', status_code=201, request_body=body,
+                       response_body=json.dumps({'data': {'id': i, 'title': f'Imported todo {i}'}}, indent=2))
+        else:
+            row.update(path=f'/api/todos/{i}', status_code=404, response_body=random.choice(errors))
+        yield row
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(workdir, "main.db")}'
+    os.environ['REQUEST_LOG_DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ['REQUEST_LOG_ASYNC'] = 'false'
+
+    from app import create_app, db
+    from app.models import RequestLog, LogBody
+    from app.utils.log_migrations import migrate_inline_bodies
+
+    app = create_app()
+    with app.app_context():
+        print(f"Inserting {count:,} synthetic rows with inline bodies...")
+        batch = []
+        for row in synthetic_rows(count):
+            batch.append(row)
+            if len(batch) == 10000:
+                db.session.execute(db.insert(RequestLog), batch)
+                db.session.commit()
+                batch = []
+        if batch:
+            db.session.execute(db.insert(RequestLog), batch)
+            db.session.commit()
+
+        logs_engine = db.engines['logs']
+        with logs_engine.connect() as conn:
+            conn.execute(db.text('VACUUM'))
+        before = os.path.getsize(path)
+
+        start = time.perf_counter()
+        migrated = migrate_inline_bodies(batch_size=10000)
+        elapsed = time.perf_counter() - start
+
+        with logs_engine.connect() as conn:
+            conn.execute(db.text('VACUUM'))
+        after = os.path.getsize(path)
+
+        print(f"Migrated rows:        {migrated:,} in {elapsed:.1f}s")
+        print(f"Distinct bodies:      {LogBody.query.count():,}")
+        print(f"Size before (inline): {before / 1024 / 1024:,.1f} MiB")
+        print(f"Size after (dedup):   {after / 1024 / 1024:,.1f} MiB")
+        print(f"Reduction:            {100 * (1 - after / before):.1f}%")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark: password verification time per hash method and cost.
+
+Times check_password_hash for each PASSWORD_HASH_METHOD / PASSWORD_HASH_COST
+combination, i.e. what one login or uncached Basic Auth check costs.
+
+Usage:
+    python benchmarks/password_cost.py [rounds]    (default: 5)
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.password_hasher import hash_method
+
+COSTS = [
+    ('scrypt', 1024),
+    ('scrypt', 4096),
+    ('scrypt', 16384),
+    ('scrypt', 32768),   # werkzeug default
+    ('scrypt', 65536),
+    ('pbkdf2', 10000),
+    ('pbkdf2', 100000),
+    ('pbkdf2', 600000),  # werkzeug default
+]
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"{'method':<8} {'cost':>8} {'verify p50':>12} {'verify max':>12}")
+    for method, cost in COSTS:
+        pwhash = generate_password_hash('test123', hash_method(method, cost))
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            check_password_hash(pwhash, 'test123')
+            times.append((time.perf_counter() - start) * 1000)
+        print(f"{method:<8} {cost:>8} {statistics.median(times):>10.2f}ms {max(times):>10.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: login throughput with password hashing inline vs on a process pool.
+
+Hammers POST /api/auth/login from several client threads for a few seconds
+while a probe thread times GET /api/health - the "every other request" that
+suffers when hashing starves the worker. Runs once inline
+(PASSWORD_HASH_WORKERS=0) and once per pool size given.
+
+Usage:
+    python benchmarks/password_hashing.py [seconds] [pool sizes...]   (default: 5s, pool of 2 and 4)
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CLIENT_THREADS = 8
+
+
+def run(workers, seconds):
+    from app import create_app
+    from app.config import Config
+    from app.utils.password_hasher import password_hasher
+
+    Config.PASSWORD_HASH_WORKERS = workers
+    Config.REQUEST_LOG_SAMPLE_RATE = 0.0
+    app = create_app('development')
+
+    deadline = time.monotonic() + seconds
+    results = {'ok': 0, 'busy': 0}
+    probe_ms = []
+    lock = threading.Lock()
+
+    def login_loop():
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            r = client.post('/api/auth/login', json={'email': 'testuser@apilab.dev', 'password': 'test123'})
+            with lock:
+                results['ok' if r.status_code == 200 else 'busy'] += 1
+
+    def probe_loop():
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            client.get('/api/health')
+            probe_ms.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(CLIENT_THREADS)]
+    threads.append(threading.Thread(target=probe_loop))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    password_hasher.shutdown()
+    probe_ms.sort()
+    return {
+        'logins_per_sec': results['ok'] / seconds,
+        'rejected': results['busy'],
+        'probe_p50': statistics.median(probe_ms),
+        'probe_p95': probe_ms[int(len(probe_ms) * 0.95) - 1]
+    }
+
+
+def main():
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/bench.db'
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    pools = [int(n) for n in sys.argv[2:]] or [2, 4]
+
+    print(f"{CLIENT_THREADS} login threads + 1 /api/health probe, {seconds:g}s each, {os.cpu_count()} CPUs\n")
+    print(f"{'mode':<12} {'logins/s':>9} {'503s':>6} {'health p50':>11} {'health p95':>11}")
+    for workers in [0] + pools:
+        stats = run(workers, seconds)
+        mode = 'inline' if workers == 0 else f'pool={workers}'
+        print(f"{mode:<12} {stats['logins_per_sec']:>9.1f} {stats['rejected']:>6} "
+              f"{stats['probe_p50']:>9.2f}ms {stats['probe_p95']:>9.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Check: peak memory of GET /api/admin/db/tables/request_logs vs table size.
+
+Fills request_logs in steps and reads the whole streamed export after each,
+tracing Python allocations - once with every column and once with a few plain
+columns (no body joins), as in the README's CSV example. A streamed response should peak at about the same
+size every time; exits with status 1 if the peak grows with the table by more
+than a factor of MAX_GROWTH.
+
+Usage:
+    python benchmarks/streaming_memory.py [rows per step] [steps] [format]    (default: 25,000 x 4, json)
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MAX_GROWTH = 1.5
+
+# ?columns= for each export read per step (None = all)
+EXPORTS = {
+    'all': None,
+    'plain': 'timestamp,method,path,status_code,latency_ms'
+}
+
+
+def main():
+    step = int(sys.argv[1]) if len(sys.argv) > 1 else 25000
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    output = sys.argv[3] if len(sys.argv) > 3 else 'json'
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/streaming.db'
+    from app import create_app, db
+    from app.models import RequestLog
+
+    app = create_app('production')
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': 'admin@apilab.dev', 'password': 'admin123'}).json['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    print(f"format={output}\n")
+    print(f"{'export':>7} {'rows':>9} {'body MB':>8} {'chunks':>7} {'peak MB':>8} {'seconds':>8}")
+    peaks = {name: [] for name in EXPORTS}
+    for n in range(1, steps + 1):
+        with app.app_context():
+            db.session.execute(db.insert(RequestLog), [
+                {'method': 'GET', 'path': f'/api/todos/{i}', 'route': '/api/todos/<int:todo_id>',
+                 'status_code': 200, 'latency_ms': i % 50, 'auth_method': 'token', 'user_id': 2,
+                 'ip_address': '127.0.0.1', 'sample_weight': 1.0}
+                for i in range(step)
+            ])
+            db.session.commit()
+            rows = db.session.scalar(db.select(db.func.count(RequestLog.id)))
+
+        for name, columns in EXPORTS.items():
+            url = f'/api/admin/db/tables/request_logs?format={output}'
+            if columns:
+                url += f'&columns={columns}'
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            response = client.get(url, headers=headers, buffered=False)
+            size = chunks = 0
+            for chunk in response.response:
+                size += len(chunk)
+                chunks += 1
+            response.close()
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            if response.status_code != 200 or size < rows:
+                print(f"{name} export failed: status {response.status_code}, {size} bytes for {rows:,} rows")
+                sys.exit(1)
+
+            peaks[name].append(peak)
+            print(f"{name:>7} {rows:>9,} {size / 1e6:>8.1f} {chunks:>7} {peak / 1e6:>8.1f} {seconds:>8.2f}")
+
+    print()
+    growth = {name: values[-1] / values[0] for name, values in peaks.items()}
+    for name, value in growth.items():
+        print(f"{name}: peak grew {value:.2f}x while the table grew {steps}x")
+    sys.exit(1 if max(growth.values()) > MAX_GROWTH else 0)
+
+
+if __name__ == '__main__':
+    main()
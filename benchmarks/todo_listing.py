@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serializing todo listings through ORM objects vs plain tuples.
+
+Builds N todos spread over many owners, then times turning all of them into
+response dicts two ways:
+
+    orm     Todo.query.all() + to_dict() (hydrates every row, lazy-loads owners)
+    tuples  one SELECT of plain columns with the owner's email joined in,
+            serialized with Todo.serialize() (what the list endpoints use)
+
+and the full GET /api/admin/db/tables/todos request for reference.
+
+Usage:
+    python benchmarks/todo_listing.py [todos] [owners]    (default: 10,000 todos, 500 owners)
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROUNDS = 5
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    owners = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/listing.db'
+    from sqlalchemy import event
+    from app import create_app, db
+    from app.models import Todo, User
+
+    app = create_app('development')
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': 'admin@apilab.dev', 'password': 'admin123'}).json['token']
+
+    with app.app_context():
+        db.session.execute(db.insert(User), [
+            {'email': f'owner{i}@apilab.dev', 'password_hash': '-', 'role': 'user'} for i in range(owners)
+        ])
+        owner_ids = db.session.scalars(db.select(User.id)).all()
+        db.session.execute(db.insert(Todo), [
+            {
+                'title': f'Todo number {i}',
+                'description': 'Understand the basics of APIs and REST architecture',
+                'completed': i % 3 == 0,
+                'user_id': owner_ids[i % len(owner_ids)]
+            }
+            for i in range(count)
+        ])
+        db.session.commit()
+        total = db.session.scalar(db.select(db.func.count(Todo.id)))
+
+        queries = [0]
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: queries.__setitem__(0, queries[0] + 1))
+
+        def orm():
+            return [todo.to_dict() for todo in Todo.query.all()]
+
+        def tuples():
+            query = (db.select(*Todo.__table__.columns, User.email.label('owner_email'))
+                     .outerjoin(User, User.id == Todo.user_id)
+                     .order_by(Todo.id))
+            return [Todo.serialize(row._mapping) for row in db.session.execute(query)]
+
+        results = {}
+        for name, fn in [('orm', orm), ('tuples', tuples)]:
+            times = []
+            for _ in range(ROUNDS):
+                db.session.remove()  # fresh identity map, like a new request
+                queries[0] = 0
+                start = time.perf_counter()
+                rows = fn()
+                times.append(time.perf_counter() - start)
+            results[name] = (statistics.median(times), queries[0], rows)
+
+        assert results['orm'][2] == results['tuples'][2], 'serializers disagree'
+
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        response = client.get('/api/admin/db/tables/todos', headers={'Authorization': f'Bearer {token}'})
+        times.append(time.perf_counter() - start)
+    assert response.json['count'] == total
+
+    print(f"{total:,} todos, {owners + 2} owners, median of {ROUNDS}\n")
+    print(f"{'path':<10} {'ms':>9} {'rows/sec':>12} {'queries':>8}")
+    for name, (seconds, query_count, _) in results.items():
+        print(f"{name:<10} {seconds * 1000:>9.1f} {total / seconds:>12,.0f} {query_count:>8}")
+    endpoint = statistics.median(times)
+    print(f"\nGET /api/admin/db/tables/todos: {endpoint * 1000:.1f}ms ({total / endpoint:,.0f} rows/sec incl. JSON)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Check: every GET /api/todos filter/sort is answered from an index.
+
+Calls the real endpoint for each supported filter and sort against a SQLite
+database with a few thousand todos, captures the SQL it runs and prints
+EXPLAIN QUERY PLAN for each statement that reads the todos table. Exits with
+status 1 if any of them does a full table scan or sorts in a temp B-tree.
+
+Usage:
+    python benchmarks/todo_query_plans.py
+"""
+
+import base64
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CASES = [
+    {},
+    {'sort': '-created_at'},
+    {'sort': 'updated_at'},
+    {'sort': '-updated_at'},
+    {'completed': 'true'},
+    {'completed': 'false', 'sort': '-created_at'},
+    {'created_since': '2025-01-10', 'created_until': '2025-02-01'},
+    {'updated_since': '2025-01-10', 'sort': '-updated_at'},
+    {'completed': 'true', 'created_since': '2025-01-10'},
+    {'fields': 'id,title,completed', 'limit': 10},
+]
+
+
+def main():
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/plans.db'
+    from sqlalchemy import event
+    from app import create_app, db
+    from app.models import Todo, User
+
+    app = create_app('development')
+    auth = {'Authorization': 'Basic ' + base64.b64encode(b'testuser@apilab.dev:test123').decode()}
+
+    with app.app_context():
+        user_ids = [u.id for u in User.query.all()]
+        start = datetime(2025, 1, 1)
+        db.session.execute(db.insert(Todo), [
+            {
+                'title': f'Todo {i}',
+                'user_id': user_ids[i % len(user_ids)],
+                'completed': i % 3 == 0,
+                'created_at': start + timedelta(minutes=i),
+                'updated_at': start + timedelta(minutes=i * 7 % 5000)
+            }
+            for i in range(5000)
+        ])
+        db.session.commit()
+        db.session.execute(db.text('ANALYZE'))
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT') and 'FROM todos' in statement:
+                statements.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        client = app.test_client()
+        failures = 0
+
+        for params in CASES:
+            statements.clear()
+            response = client.get('/api/todos', query_string=params, headers=auth)
+            # Follow one cursor too, so the keyset predicate is checked
+            if response.json.get('next_cursor'):
+                client.get('/api/todos', query_string={**params, 'cursor': response.json['next_cursor']}, headers=auth)
+
+            print(f"GET /api/todos {params or ''} -> {response.status_code}")
+            seen = set()
+            for statement, parameters in statements:
+                plan = [row[-1] for row in db.session.connection().exec_driver_sql(
+                    'EXPLAIN QUERY PLAN ' + statement, parameters
+                )]
+                key = ' | '.join(plan)
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                bad = [step for step in plan
+                       if (step.startswith('SCAN todos') and 'INDEX' not in step) or 'TEMP B-TREE' in step]
+                failures += bool(bad)
+                print(f"   {'FAIL' if bad else 'ok  '} {key}")
+
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    print()
+    print('All todo queries use an index' if not failures else f'{failures} queries scan or sort without an index')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
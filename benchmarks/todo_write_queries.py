@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Check: SQL statements per todo write (PATCH / DELETE /api/todos/<id>).
+
+Calls the real endpoints for an owned, a foreign and a missing todo and counts
+the statements each one runs against the todos table, with and without
+RETURNING support. Exits with status 1 if a successful write takes more than
+two statements.
+
+Usage:
+    python benchmarks/todo_write_queries.py
+"""
+
+import base64
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MAX_STATEMENTS = 2
+
+
+def main():
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/writes.db'
+    from sqlalchemy import event
+    from app import create_app, db
+    from app.models import Todo, User
+
+    app = create_app('development')
+    auth = {'Authorization': 'Basic ' + base64.b64encode(b'testuser@apilab.dev:test123').decode()}
+    client = app.test_client()
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if 'todos' in statement:
+            statements.append(statement.split()[0])
+
+    with app.app_context():
+        owner_id = User.query.filter_by(email='testuser@apilab.dev').first().id
+        admin_id = User.query.filter_by(email='admin@apilab.dev').first().id
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        dialect = db.engine.dialect
+        supports = (dialect.update_returning, dialect.delete_returning)
+
+        def new_todo(user_id):
+            todo = Todo(title='Write me', user_id=user_id)
+            db.session.add(todo)
+            db.session.commit()
+            return todo.id
+
+        failures = 0
+        client.get('/api/todos?limit=1', headers=auth)  # warm the auth caches
+
+        for returning in (True, False):
+            dialect.update_returning = dialect.delete_returning = returning and supports[0]
+            print(f"RETURNING {'on' if dialect.update_returning else 'off'}")
+
+            for method, target, expected in [
+                ('PATCH', new_todo(owner_id), 200),
+                ('PATCH', new_todo(admin_id), 403),
+                ('PATCH', 999999, 404),
+                ('DELETE', new_todo(owner_id), 204),
+                ('DELETE', new_todo(admin_id), 403),
+                ('DELETE', 999999, 404),
+            ]:
+                statements.clear()
+                response = client.open(f'/api/todos/{target}', method=method,
+                                       json={'completed': True} if method == 'PATCH' else None, headers=auth)
+                bad = response.status_code != expected or (expected < 400 and len(statements) > MAX_STATEMENTS)
+                failures += bad
+                print(f"   {'FAIL' if bad else 'ok  '} {method:<6} -> {response.status_code}  "
+                      f"{len(statements)} statement(s): {', '.join(statements)}")
+
+        dialect.update_returning, dialect.delete_returning = supports
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    print()
+    print('All writes within budget' if not failures else f'{failures} writes failed or ran too many statements')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Upgrade request logs written by older versions:
+- move logs out of the main database into the logs bind
+- move inline request/response bodies into deduplicated, compressed storage
+- fill in the route template used for analytics grouping
+"""
+
+from app import create_app, db
+from app.utils.log_migrations import move_logs_to_bind, migrate_inline_bodies, backfill_routes
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        print("📦 Moving request logs into the logs database...")
+        moved = move_logs_to_bind()
+        print(f"✅ Moved {moved} request logs")
+        
+        print("🗜️  Migrating request log bodies...")
+        migrated = migrate_inline_bodies()
+        print(f"✅ Migrated {migrated} request logs")
+        
+        print("🧭 Backfilling route templates...")
+        print(f"✅ Updated {backfill_routes()} request logs")
+        
+        # Reclaim the space freed in whichever database changed
+        engines = []
+        if moved:
+            engines.append(db.engine)
+        if migrated:
+            engines.append(db.engines['logs'])
+        
+        for engine in engines:
+            if engine.dialect.name == 'sqlite':
+                print(f"🧹 Running VACUUM on {engine.url.database}...")
+                with engine.connect() as conn:
+                    conn.execute(db.text('VACUUM'))